@@ -0,0 +1,93 @@
+"""LAN discovery against local stand-in servers.
+
+Starts ``--hubs`` fake MHUBs and ``--decoys`` HTTP servers that are not
+MHUBs (404s and foreign JSON), adds ``--closed`` refused ports and
+``--silent`` addresses that never answer (TEST-NET-1, so every probe runs
+into the per-host timeout), scans them all with the config flow's scanner
+and reports what was found and how long it took.
+
+    python benchmarks/bench_discovery.py --hubs 3 --decoys 20 --closed 30 --silent 200
+
+Exits non-zero when a hub is missed, a decoy is reported, or the scan
+exceeds the budget.
+"""
+import argparse
+import asyncio
+import json
+import socket
+import sys
+import time
+
+from aiohttp import web
+
+from common import load
+from fake_mhub import FakeMHUB
+
+discovery = load("discovery")
+
+
+async def start_decoy(n):
+    async def handler(request):
+        if n % 2:
+            raise web.HTTPNotFound()
+        return web.json_response({"status": "ok", "data": {"printer": f"decoy {n}"}})
+
+    app = web.Application()
+    app.router.add_get("/api/data/100/", handler)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    return runner, f"127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+
+
+def closed_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return f"127.0.0.1:{s.getsockname()[1]}"
+
+
+async def run(args):
+    hubs = [FakeMHUB(4, 4, name=f"MHUB S (4x4) {n}") for n in range(args.hubs)]
+    hub_hosts = [await hub.start() for hub in hubs]
+    decoys = [await start_decoy(n) for n in range(args.decoys)]
+    hosts = hub_hosts + [host for _, host in decoys]
+    hosts += [closed_port() for _ in range(args.closed)]
+    hosts += [f"192.0.2.{n % 254 + 1}:{80 + n // 254}" for n in range(args.silent)]
+    try:
+        started = time.perf_counter()
+        found = await discovery.async_discover(hosts, args.concurrency, args.timeout)
+        elapsed = time.perf_counter() - started
+    finally:
+        for hub in hubs:
+            await hub.stop()
+        for runner, _ in decoys:
+            await runner.cleanup()
+    return {
+        "scanned": len(hosts),
+        "found": [{"host": hub.host, "name": hub.name} for hub in found],
+        "missed": sorted(set(hub_hosts) - {hub.host for hub in found}),
+        "false_positives": sorted({hub.host for hub in found} - set(hub_hosts)),
+        "seconds": round(elapsed, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hubs", type=int, default=3)
+    parser.add_argument("--decoys", type=int, default=20)
+    parser.add_argument("--closed", type=int, default=30)
+    parser.add_argument("--silent", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--timeout", type=float, default=1.0)
+    parser.add_argument("--budget", type=float, default=5.0, help="maximum scan time in seconds")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    print(json.dumps(result, indent=2))
+    if result["missed"] or result["false_positives"] or result["seconds"] > args.budget:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
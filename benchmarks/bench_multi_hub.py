@@ -0,0 +1,113 @@
+"""Poll many simulated hubs through one shared connection pool.
+
+Mirrors the coordinator's hot loop (GET /api/data/200/, build the routing
+index, diff it against the previous one with models.changed_outputs) for every hub, scheduled
+into per-hub slots with the coordinator's polling.next_slot. Hubs switch
+between ``--interval`` and ``--idle-interval`` every couple of rounds, out
+of step with each other, and ``peak_starts_per_100ms`` reports how well
+the polls stay spread. The fake hubs run in a child process, so the CPU
+figure is the client's.
+
+    python benchmarks/bench_multi_hub.py --hubs 50 --rounds 10
+
+Exits non-zero when the p95 poll latency or the CPU per poll exceeds the
+budget.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+from common import load, summarize
+from fake_mhub import HubProcess
+
+api = load("api")
+models = load("models")
+polling = load("polling")
+
+
+async def poll_hub(client, n, intervals, rounds, latencies, starts):
+    loop = asyncio.get_running_loop()
+    phase = polling.hub_phase(f"entry{n}")
+    index = models.RoutingIndex()
+    device = models.DeviceInfo()
+    for r in range(rounds):
+        # two rounds fast, two idle, shifted per hub
+        interval = intervals[(r + n) // 2 % 2]
+        await asyncio.sleep(polling.next_slot(loop.time(), interval, phase) - loop.time())
+        starts.append(loop.time())
+        started = time.perf_counter()
+        zones = await client.async_get_zones()
+        new = models.RoutingIndex.build(device, zones, index)
+        models.changed_outputs(index, new)
+        index = new
+        latencies.append(time.perf_counter() - started)
+
+
+def peak_starts(starts, window=0.1):
+    """Most polls started within any ``window`` seconds."""
+    starts = sorted(starts)
+    peak = first = 0
+    for last, at in enumerate(starts):
+        while at - starts[first] > window:
+            first += 1
+        peak = max(peak, last - first + 1)
+    return peak
+
+
+async def run(args, hosts):
+    session = api.create_session()
+    clients = [api.MHUBApiClient(host, session) for host in hosts]
+    latencies = []
+    starts = []
+    intervals = (args.interval, args.idle_interval)
+    cpu_started = time.process_time()
+    wall_started = time.perf_counter()
+    await asyncio.gather(
+        *(
+            poll_hub(client, n, intervals, args.rounds, latencies, starts)
+            for n, client in enumerate(clients)
+        )
+    )
+    wall = time.perf_counter() - wall_started
+    cpu = time.process_time() - cpu_started
+    await session.close()
+    return latencies, starts, cpu, wall
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hubs", type=int, default=50)
+    parser.add_argument("--outputs", type=int, default=8)
+    parser.add_argument("--inputs", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--interval", type=float, default=1.0)
+    parser.add_argument("--idle-interval", type=float, default=3.0)
+    parser.add_argument("--max-p95-ms", type=float, default=50.0)
+    parser.add_argument("--max-cpu-ms-per-poll", type=float, default=5.0)
+    args = parser.parse_args()
+
+    hubs = HubProcess(args.hubs, inputs=args.inputs, outputs=args.outputs)
+    try:
+        latencies, starts, cpu, wall = asyncio.run(run(args, hubs.hosts))
+    finally:
+        hubs.stop()
+
+    polls = len(latencies)
+    result = {
+        "hubs": args.hubs,
+        "polls": polls,
+        "latency": summarize(latencies),
+        "peak_starts_per_100ms": peak_starts(starts),
+        "cpu_ms_per_poll": round(cpu / polls * 1000, 3),
+        "cpu_utilisation": round(cpu / wall, 3),
+    }
+    print(json.dumps(result, indent=2))
+    if result["latency"]["p95_ms"] > args.max_p95_ms or result["cpu_ms_per_poll"] > args.max_cpu_ms_per_poll:
+        print("over budget", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""Performance benchmark suite against the fake MHUB.
+
+For each matrix size it measures, through the integration's own API client
+and routing index:
+
+- startup: concurrent /100 + /200 fetch, index build and power probe
+  (what the coordinator's first refresh does), fresh connections each time
+- poll: hot-loop /api/data/200/ latency and bytes per poll, compared with
+  fetching /100 + /200 every poll
+- commands: switch commands per second through one client
+- update_cpu: CPU per refresh to decode and parse /200, build the index,
+  diff it with the coordinator's models.changed_outputs and serve the
+  per-entity lookups of changed outputs (media player, volume, mute), vs.
+  rewriting every entity
+
+The fake hub runs in-process, so latencies include its (small) serving cost.
+
+    python benchmarks/bench_suite.py --sizes 4x4,8x8,16x16,64x64
+    python benchmarks/bench_suite.py --latency 0.02 --failure-rate 0.05
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from common import load, summarize
+from fake_mhub import FakeMHUB
+
+api = load("api")
+models = load("models")
+
+
+async def bench_startup(hub, host, repeats):
+    durations = []
+    failures = 0
+    for _ in range(repeats):
+        started = time.perf_counter()
+        client = api.MHUBApiClient(host)
+        try:
+            device, zones = await asyncio.gather(client.async_get_device_info(), client.async_get_zones())
+            models.RoutingIndex.build(device, zones)
+            await client.async_probe_power()
+            durations.append(time.perf_counter() - started)
+        except api.MHUBApiError:
+            failures += 1
+        finally:
+            await client.async_close()
+    return {**summarize(durations), "failures": failures}
+
+
+async def bench_poll(hub, client, polls):
+    hub.reset_stats()
+    latencies = []
+    failures = 0
+    for _ in range(polls):
+        started = time.perf_counter()
+        try:
+            await client.async_get_zones()
+        except api.MHUBApiError:
+            failures += 1
+            continue
+        latencies.append(time.perf_counter() - started)
+    info_bytes = len(json.dumps(hub.info_document()).encode())
+    state_bytes = hub.bytes_sent["data/200"] / max(1, hub.requests["data/200"] - failures)
+    return {
+        "latency": summarize(latencies),
+        "failures": failures,
+        "bytes_per_poll": round(state_bytes),
+        "bytes_per_poll_untiered": round(state_bytes + info_bytes),
+    }
+
+
+async def bench_commands(hub, client, count):
+    outputs = hub.outputs
+    failures = 0
+
+    async def send(n):
+        nonlocal failures
+        try:
+            await client.async_switch(outputs[n % len(outputs)], (n % hub.inputs) + 1)
+        except api.MHUBApiError:
+            failures += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(send(n) for n in range(count)))
+    elapsed = time.perf_counter() - started
+    return {"commands": count, "failures": failures, "per_second": round(count / elapsed, 1)}
+
+
+def bench_update_cpu(hub, refreshes, change_ratio):
+    rng = random.Random(1)
+    device = models.DeviceInfo.from_data(hub.info_document()["data"])
+    documents = []
+    for _ in range(refreshes):
+        outputs = list(hub.routes)
+        for output_id in rng.sample(outputs, max(1, int(len(outputs) * change_ratio))):
+            hub.routes[output_id] = rng.randint(1, hub.inputs)
+        documents.append(json.dumps(hub.state_document()).encode())
+
+    def run(only_changed):
+        index = models.RoutingIndex.build(device, models.parse_zones(json.loads(documents[0])["data"]))
+        started = time.process_time()
+        for body in documents:
+            # decode + parse is part of the per-refresh cost
+            new = models.RoutingIndex.build(device, models.parse_zones(api._loads(body)["data"]), index)
+            # the coordinator's diff; None would make every entity rewrite
+            changed = models.changed_outputs(index, new) if only_changed else None
+            for output_id in new.outputs:
+                # each entity's write filter (MHUBEntity._should_write -> output_changed), then its reads
+                if changed is not None and output_id not in changed:
+                    continue
+                # media player (source label + power), volume number, mute switch
+                s = new.output(output_id)
+                new.input_label(s.input_id), s.active, new.sources().source_list
+                new.output(output_id).volume
+                new.output(output_id).mute
+            index = new
+        return (time.process_time() - started) / refreshes * 1000
+
+    return {
+        "changed_only_ms": round(run(True), 4),
+        "all_entities_ms": round(run(False), 4),
+    }
+
+
+async def bench_size(inputs, outputs, args):
+    hub = FakeMHUB(
+        inputs, outputs, latency=args.latency, failure_rate=args.failure_rate, seed=1,
+        audio_zones=args.audio_zones,
+    )
+    host = await hub.start()
+    client = api.MHUBApiClient(host)
+    try:
+        result = {
+            "size": f"{inputs}x{outputs}",
+            "startup": await bench_startup(hub, host, args.startup_repeats),
+            "poll": await bench_poll(hub, client, args.polls),
+            "commands": await bench_commands(hub, client, args.commands),
+            "update_cpu": bench_update_cpu(hub, args.refreshes, args.change_ratio),
+        }
+    finally:
+        await client.async_close()
+        await hub.stop()
+    return result
+
+
+async def run(args):
+    results = []
+    for size in args.sizes.split(","):
+        inputs, outputs = (int(n) for n in size.lower().split("x"))
+        results.append(await bench_size(inputs, outputs, args))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="4x4,8x8,16x16,64x64")
+    parser.add_argument("--polls", type=int, default=200)
+    parser.add_argument("--commands", type=int, default=200)
+    parser.add_argument("--refreshes", type=int, default=200)
+    parser.add_argument("--startup-repeats", type=int, default=5)
+    parser.add_argument("--change-ratio", type=float, default=0.05)
+    parser.add_argument("--audio-zones", type=int, default=0, help="numbered audio zones per hub")
+    parser.add_argument("--latency", type=float, default=0.0, help="injected seconds per request")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="share of requests answered with HTTP 500")
+    parser.add_argument("--output", help="also write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    text = json.dumps(results, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""Shared helpers for the benchmark scripts."""
+import importlib
+import statistics
+import sys
+import types
+from pathlib import Path
+
+PACKAGE_DIR = Path(__file__).resolve().parents[1] / "custom_components" / "mhub"
+
+
+def load(module):
+    """Import an HA-independent module of the integration (api, models, const).
+
+    The package ``__init__`` imports Home Assistant, so the modules are loaded
+    under a bare ``mhub`` namespace instead; their relative imports still work.
+    """
+    if "mhub" not in sys.modules:
+        package = types.ModuleType("mhub")
+        package.__path__ = [str(PACKAGE_DIR)]
+        sys.modules["mhub"] = package
+    return importlib.import_module(f"mhub.{module}")
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def summarize(values):
+    """Milliseconds summary of a list of durations in seconds."""
+    return {
+        "n": len(values),
+        "mean_ms": round(statistics.fmean(values) * 1000, 3) if values else 0.0,
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p95_ms": round(percentile(values, 95) * 1000, 3),
+        "max_ms": round(max(values) * 1000, 3) if values else 0.0,
+    }
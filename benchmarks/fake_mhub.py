@@ -0,0 +1,235 @@
+"""In-process stand-in for the MHUB REST API, for benchmarks.
+
+Serves /api/data/100/ and /api/data/200/ for a configurable matrix (4x4 up
+to stacked 64x64, optionally with numbered audio zones) and applies /api/control/switch|volume|mute|power/...
+and /api/power/... commands to its state. ``latency`` delays every
+response and ``failure_rate`` answers that share of requests with HTTP 500.
+"""
+import asyncio
+from collections import Counter
+import json
+import multiprocessing
+import random
+import string
+
+from aiohttp import web
+
+
+def output_ids(count):
+    """a, b, ... z, aa, ab, ... (the hub's output naming)."""
+    ids = []
+    for n in range(count):
+        name = ""
+        n += 1
+        while n:
+            n, rem = divmod(n - 1, 26)
+            name = string.ascii_lowercase[rem] + name
+        ids.append(name)
+    return ids
+
+
+class FakeMHUB:
+    """A single fake hub with an ``inputs`` x ``outputs`` video matrix."""
+
+    def __init__(
+        self, inputs=8, outputs=8, name=None, latency=0.0, failure_rate=0.0, seed=None, audio_zones=0
+    ):
+        self.inputs = inputs
+        self.outputs = output_ids(outputs)
+        # audio zones are numbered ("1", "2", ...) and route from as many audio inputs as video inputs
+        self.audio_outputs = [str(n) for n in range(1, audio_zones + 1)]
+        self.name = name or f"MHUB S ({inputs}x{outputs}) 100"
+        self.routes = {o: (i % inputs) + 1 for i, o in enumerate(self.outputs + self.audio_outputs)}
+        self.volumes = {o: 50 for o in self.routes}
+        self.mutes = {o: False for o in self.routes}
+        self.power = True
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+        # per endpoint ("data/200", "control/switch", ...)
+        self.requests = Counter()
+        self.bytes_sent = Counter()
+        self._runner = None
+        self.port = None
+
+    def info_document(self):
+        io_audio = {}
+        if self.audio_outputs:
+            io_audio = {
+                "input_audio": [
+                    {
+                        "ports": self.inputs,
+                        "labels": [
+                            {"id": i, "label": f"Audio Input {i}"} for i in range(1, self.inputs + 1)
+                        ],
+                    }
+                ],
+                "output_audio": [
+                    {
+                        "ports": len(self.audio_outputs),
+                        "labels": [{"id": o, "label": f"Audio Zone {o}"} for o in self.audio_outputs],
+                    }
+                ],
+            }
+        return {
+            "header": {"version": "2.1"},
+            "data": {
+                "mhub": {
+                    "mhub_official_name": self.name,
+                    "mhub_name": self.name,
+                    "api": "2.1",
+                    "mhub-os_version": "8.20",
+                },
+                "io_data": {
+                    "input_video": [
+                        {
+                            "ports": self.inputs,
+                            "labels": [
+                                {"id": i, "label": f"Input {i}"} for i in range(1, self.inputs + 1)
+                            ],
+                        }
+                    ],
+                    "output_video": [
+                        {
+                            "ports": len(self.outputs),
+                            "labels": [
+                                {"id": o, "label": f"Video Output {o.upper()}"} for o in self.outputs
+                            ],
+                        }
+                    ],
+                    **io_audio,
+                },
+            },
+        }
+
+    def state_document(self):
+        return {
+            "header": {"version": "2.1"},
+            "data": {
+                "zones": [
+                    {
+                        "zone_id": f"zone{n}",
+                        "state": [
+                            {
+                                "output_id": o,
+                                "input_id": self.routes[o],
+                                "volume": self.volumes[o],
+                                "mute": self.mutes[o],
+                            }
+                        ],
+                    }
+                    for n, o in enumerate(self.outputs + self.audio_outputs, start=1)
+                ]
+            },
+        }
+
+    def reset_stats(self):
+        self.requests.clear()
+        self.bytes_sent.clear()
+
+    async def _respond(self, endpoint, document):
+        self.requests[endpoint] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.failure_rate and self._random.random() < self.failure_rate:
+            raise web.HTTPInternalServerError(text="injected failure")
+        body = json.dumps(document).encode()
+        self.bytes_sent[endpoint] += len(body)
+        return web.Response(body=body, content_type="application/json")
+
+    def _output(self, request):
+        output_id = request.match_info["output"].lower()
+        if output_id not in self.routes:
+            raise web.HTTPNotFound()
+        return output_id
+
+    async def _data(self, request):
+        code = request.match_info["code"]
+        if code == "100":
+            document = self.info_document()
+        elif code == "200":
+            document = self.state_document()
+        else:
+            raise web.HTTPNotFound()
+        return await self._respond(f"data/{code}", document)
+
+    async def _switch(self, request):
+        output_id = self._output(request)
+        self.routes[output_id] = int(request.match_info["input"])
+        return await self._respond("control/switch", {"header": {"version": "2.1"}, "data": {}})
+
+    async def _volume(self, request):
+        output_id = self._output(request)
+        self.volumes[output_id] = max(0, min(100, int(request.match_info["value"])))
+        return await self._respond("control/volume", {"header": {"version": "2.1"}, "data": {}})
+
+    async def _mute(self, request):
+        output_id = self._output(request)
+        self.mutes[output_id] = request.match_info["state"] == "true"
+        return await self._respond("control/mute", {"header": {"version": "2.1"}, "data": {}})
+
+    async def _power(self, request):
+        value = request.match_info["value"].rstrip("/").rsplit("/", 1)[-1]
+        self.power = value == "1"
+        return await self._respond("control/power", {"header": {"version": "2.1"}, "data": {}})
+
+    def app(self):
+        app = web.Application()
+        app.router.add_get("/api/data/{code}/", self._data)
+        app.router.add_get("/api/control/switch/{output}/{input}/", self._switch)
+        app.router.add_get("/api/control/volume/{output}/{value}/", self._volume)
+        app.router.add_get("/api/control/mute/{output}/{state}/", self._mute)
+        app.router.add_get("/api/control/power/{value:.+}", self._power)
+        app.router.add_get("/api/power/{value:.+}", self._power)
+        return app
+
+    async def start(self, host="127.0.0.1", port=0):
+        self._runner = web.AppRunner(self.app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        return f"{host}:{self.port}"
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+def _wait_closed(conn):
+    try:
+        conn.recv()
+    except EOFError:
+        pass
+
+
+def _serve(count, kwargs, conn):
+    async def main():
+        hubs = [FakeMHUB(**kwargs) for _ in range(count)]
+        hosts = [await hub.start() for hub in hubs]
+        conn.send(hosts)
+        # serve until the parent closes the pipe
+        await asyncio.get_running_loop().run_in_executor(None, _wait_closed, conn)
+        for hub in hubs:
+            await hub.stop()
+
+    asyncio.run(main())
+
+
+class HubProcess:
+    """Run ``count`` fake hubs in a child process so their CPU is not billed to the client."""
+
+    def __init__(self, count, **kwargs):
+        ctx = multiprocessing.get_context("spawn")
+        self._conn, child = ctx.Pipe()
+        self._process = ctx.Process(target=_serve, args=(count, kwargs, child), daemon=True)
+        self._process.start()
+        child.close()
+        self.hosts = self._conn.recv()
+
+    def stop(self):
+        self._conn.close()
+        self._process.join(timeout=5)
+        if self._process.is_alive():
+            self._process.terminate()
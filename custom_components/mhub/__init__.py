@@ -1,21 +1,62 @@
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-from .const import DOMAIN
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.storage import Store
+from .api import create_session
+from .const import DOMAIN, STORAGE_VERSION
 from .coordinator import MHUBDataUpdateCoordinator
+from .services import async_setup_services, async_unload_services
 
-PLATFORMS = ["media_player", "number", "switch"]
+PLATFORMS = ["media_player", "number", "sensor", "switch"]
+
+# one connection pool for all hubs, bounded globally and per host
+DATA_SESSION = f"{DOMAIN}_session"
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
-    coordinator = MHUBDataUpdateCoordinator(hass, entry)
-    # perform first refresh and detect model
-    await coordinator.async_config_entry_first_refresh()
+    await er.async_migrate_entries(hass, entry.entry_id, _migrate_unique_id(entry))
+    if DATA_SESSION not in hass.data:
+        hass.data[DATA_SESSION] = create_session()
+    coordinator = MHUBDataUpdateCoordinator(hass, entry, hass.data[DATA_SESSION])
+    if await coordinator.async_load_cache():
+        # entities come from the cached device info (unavailable until the first poll lands);
+        # the hub is polled in the background
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN} first refresh {entry.title}"
+        )
+    else:
+        # nothing cached yet: perform first refresh and detect model
+        await coordinator.async_config_entry_first_refresh()
     # store model info for use by platforms
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    async_setup_services(hass)
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
     return True
 
+def _migrate_unique_id(entry: ConfigEntry):
+    # pre multi-hub ids ("mhub_output_a", "mhub_system_power", ...) were not namespaced per hub
+    @callback
+    def _migrate(entity_entry: er.RegistryEntry):
+        if entity_entry.unique_id.startswith("mhub_"):
+            return {"new_unique_id": f"{entry.entry_id}_{entity_entry.unique_id[5:]}"}
+        return None
+
+    return _migrate
+
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry):
+    # polling bounds apply live; no reload needed
+    hass.data[DOMAIN][entry.entry_id].async_apply_options(entry.options)
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry):
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        await coordinator.async_close()
+        if not hass.data[DOMAIN]:
+            async_unload_services(hass)
+            await hass.data.pop(DATA_SESSION).close()
     return unload_ok
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry):
+    # drop the persisted capability and device-info cache along with the entry
+    await Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}").async_remove()
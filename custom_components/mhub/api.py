@@ -0,0 +1,276 @@
+"""Async client for the HDAnywhere MHUB REST API."""
+import asyncio
+import json
+import logging
+import random
+import time
+
+import aiohttp
+
+try:
+    from orjson import loads as _loads
+except ImportError:  # optional speedup; json.loads takes bytes as well
+    _loads = json.loads
+
+from .const import (
+    BREAKER_RESET,
+    BREAKER_THRESHOLD,
+    DEFAULT_MAX_CONNECTIONS,
+    DEFAULT_REQUEST_DEADLINE,
+    GLOBAL_MAX_CONNECTIONS,
+    READ_RETRIES,
+    REQUEST_DEADLINES,
+    RETRY_BACKOFF,
+)
+from .models import DeviceInfo, parse_zones
+from .stats import RequestStats
+
+_LOGGER = logging.getLogger(__name__)
+
+HEADERS = {"User-Agent": "curl/8.0", "Accept": "application/json"}
+
+
+def create_session(limit=GLOBAL_MAX_CONNECTIONS, limit_per_host=DEFAULT_MAX_CONNECTIONS):
+    """Keep-alive session bounded globally and per host, shareable by many hubs."""
+    connector = aiohttp.TCPConnector(
+        limit=limit, limit_per_host=limit_per_host, keepalive_timeout=30
+    )
+    return aiohttp.ClientSession(connector=connector, headers=HEADERS)
+
+
+class MHUBApiError(Exception):
+    """Raised when the MHUB rejects or fails a request."""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+class MHUBTimeoutError(MHUBApiError, asyncio.TimeoutError):
+    """Raised when a request misses its deadline."""
+
+
+class MHUBUnavailableError(MHUBApiError):
+    """Raised without contacting the hub while the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker for one hub.
+
+    closed: requests flow. open: requests fail fast for ``reset_timeout``
+    seconds. half-open: one probe request is let through; its outcome closes
+    or re-opens the breaker.
+    """
+
+    __slots__ = ("threshold", "reset_timeout", "failures", "opened_at", "_probing", "trips")
+
+    def __init__(self, threshold=BREAKER_THRESHOLD, reset_timeout=BREAKER_RESET):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+        self.trips = 0
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if self._probing or time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self):
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self._probing or (self.opened_at is None and self.failures >= self.threshold):
+            if self.opened_at is None:
+                self.trips += 1
+            self.opened_at = time.monotonic()
+        self._probing = False
+
+    def abandon(self):
+        """A request ended without an outcome (cancelled); free the half-open probe slot."""
+        self._probing = False
+
+    @property
+    def retry_in(self):
+        """Seconds until the breaker lets a probe through (0 once it would)."""
+        if self.opened_at is None:
+            return 0
+        return max(0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    def as_dict(self):
+        return {"state": self.state, "consecutive_failures": self.failures, "trips": self.trips}
+
+
+class MHUBApiClient:
+    """Keep-alive connection pool and typed calls for a single MHUB.
+
+    One client is owned by each config entry's coordinator; every platform
+    sends its commands through it instead of opening its own session. When
+    ``session`` is given (the integration-wide pool) it is shared and not
+    closed by the client; otherwise the client owns a private pool.
+    """
+
+    def __init__(self, host, session=None, max_connections=DEFAULT_MAX_CONNECTIONS):
+        self.host = host
+        self._base = f"http://{host}"
+        self._max_connections = max_connections
+        self._limit = asyncio.Semaphore(max_connections)
+        self._session = session
+        self._owns_session = session is None
+        self.stats = RequestStats()
+        self.breaker = CircuitBreaker()
+
+    def _get_session(self):
+        if self._session is None or (self._owns_session and self._session.closed):
+            self._session = create_session(self._max_connections, self._max_connections)
+        return self._session
+
+    async def async_close(self):
+        if self._owns_session and self._session is not None and not self._session.closed:
+            await self._session.close()
+            self._session = None
+
+    async def _request(self, path, endpoint, retries=0):
+        """GET ``path`` within the endpoint's deadline, through the circuit breaker.
+
+        Only idempotent reads pass ``retries``; transport errors, timeouts and
+        5xx answers are then retried with jittered exponential backoff.
+        """
+        stats = self.stats.endpoint(endpoint)
+        deadline = REQUEST_DEADLINES.get(endpoint, DEFAULT_REQUEST_DEADLINE)
+        for attempt in range(retries + 1):
+            if not self.breaker.allow():
+                stats.rejected += 1
+                if attempt:
+                    # our own failed attempt re-opened the breaker: report that failure
+                    raise error
+                raise MHUBUnavailableError(f"MHUB {self.host} is unavailable, not sending {endpoint}")
+            try:
+                body = await self._request_once(path, stats, deadline)
+            except asyncio.TimeoutError as e:
+                error = MHUBTimeoutError(f"{endpoint} missed its {deadline}s deadline")
+                error.__cause__ = e
+            except (aiohttp.ClientError, OSError) as e:
+                error = MHUBApiError(f"{endpoint}: {e}")
+                error.__cause__ = e
+            except MHUBApiError as e:
+                if e.status is not None and e.status < 500:
+                    # the hub answered; it is up but rejected the request
+                    self.breaker.record_success()
+                    raise
+                error = e
+            except BaseException:
+                # cancelled (e.g. by the poll deadline): no verdict on the hub
+                self.breaker.abandon()
+                raise
+            else:
+                self.breaker.record_success()
+                return body
+            self.breaker.record_failure()
+            if attempt == retries:
+                raise error
+            stats.retries += 1
+            delay = RETRY_BACKOFF * 2**attempt
+            await asyncio.sleep(delay / 2 + random.uniform(0, delay / 2))
+
+    async def _request_once(self, path, stats, deadline):
+        stats.requests += 1
+        started = time.monotonic()
+        try:
+            async with asyncio.timeout(deadline):
+                # the deadline covers waiting for a pooled connection as well
+                async with self._limit:
+                    session = self._get_session()
+                    async with session.get(f"{self._base}{path}", allow_redirects=True) as resp:
+                        body = await resp.read()
+        except asyncio.TimeoutError:
+            stats.timeouts += 1
+            raise
+        except Exception:
+            stats.failures += 1
+            raise
+        stats.latency.record(time.monotonic() - started)
+        stats.bytes += len(body)
+        if resp.status != 200:
+            stats.failures += 1
+            raise MHUBApiError(
+                f"HTTP {resp.status}: {body[:200].decode(errors='replace')}", status=resp.status
+            )
+        return body
+
+    async def async_get_data(self, code, retries=READ_RETRIES):
+        """Return the decoded /api/data/{code}/ document ({} if unparseable).
+
+        The body is parsed straight from bytes, once.
+        """
+        endpoint = f"data/{code}"
+        raw = await self._request(f"/api/data/{code}/", endpoint, retries=retries)
+        started = time.monotonic()
+        try:
+            return _loads(raw)
+        except ValueError as e:
+            _LOGGER.error("JSON decode error: %s\nRaw: %s", e, raw[:400].decode(errors="replace"))
+            return {}
+        finally:
+            self.stats.endpoint(endpoint).decode.record(time.monotonic() - started)
+
+    async def _async_get_document(self, code):
+        document = await self.async_get_data(code)
+        if not document:
+            raise MHUBApiError(f"Empty response from /api/data/{code}/")
+        return document.get("data") or {}
+
+    async def async_get_device_info(self):
+        """Static device document (/api/data/100/) as a DeviceInfo."""
+        return DeviceInfo.from_data(await self._async_get_document(100))
+
+    async def async_get_zones(self):
+        """Live zone state (/api/data/200/) as a tuple of Zone."""
+        return parse_zones(await self._async_get_document(200))
+
+    async def async_switch(self, output_id, input_id):
+        await self._request(f"/api/control/switch/{str(output_id).lower()}/{input_id}/", "control/switch")
+
+    async def async_set_volume(self, output_id, volume):
+        await self._request(f"/api/control/volume/{str(output_id).lower()}/{int(volume)}/", "control/volume")
+
+    async def async_set_mute(self, output_id, mute):
+        state = "true" if mute else "false"
+        await self._request(f"/api/control/mute/{str(output_id).lower()}/{state}/", "control/mute")
+
+    async def async_power(self, value):
+        """Global power trigger (/api/power/{0|1}/)."""
+        await self._request(f"/api/power/{1 if value else 0}/", "power")
+
+    async def async_probe_power(self):
+        """Return True if the hub accepts the power control endpoint, False if it rejects it.
+
+        Timeouts, transport errors and an open breaker give no answer and raise.
+        """
+        try:
+            await self._request("/api/control/power/a/1/", "control/power")
+        except MHUBApiError as e:
+            if e.status is not None and e.status < 500:
+                return False
+            raise
+        return True
+
+    async def async_system_power(self, value):
+        """Full-system power (/api/control/power/{0|1}/)."""
+        await self._request(f"/api/control/power/{1 if value else 0}/", "control/power")
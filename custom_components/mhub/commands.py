@@ -0,0 +1,132 @@
+"""Ordered, bounded command scheduling for the MHUB control endpoints."""
+import asyncio
+import logging
+import time
+
+from homeassistant.core import callback
+
+from .const import DEFAULT_COMMAND_CONCURRENCY
+from .stats import LatencyHistogram
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class _Command:
+    __slots__ = ("send", "args", "queued_at", "future")
+
+    def __init__(self, send, args, queued_at, future):
+        self.send = send
+        self.args = args
+        self.queued_at = queued_at
+        self.future = future
+
+
+class CommandScheduler:
+    """Per-hub command queue.
+
+    Commands are keyed by output and kind ("switch", "volume", "mute", ...).
+    Commands for one output run strictly in submission order, different
+    outputs run in parallel up to ``limit``. A pending command is superseded
+    by a newer one of the same kind for the same output, so a dragged slider
+    or a burst of source changes only sends the latest value.
+
+    ``async_submit`` returns a future resolving to True (sent), False
+    (failed) or None (superseded before it was sent). ``on_idle`` runs once
+    when the queue drains, i.e. once per burst.
+    """
+
+    def __init__(self, hass, limit=DEFAULT_COMMAND_CONCURRENCY, on_idle=None):
+        self._hass = hass
+        self._on_idle = on_idle
+        self._limit = asyncio.Semaphore(limit)
+        self._queues = {}
+        self._workers = {}
+        # output -> monotonic time its queue last drained
+        self._settled = {}
+        self.completed = 0
+        self.failed = 0
+        self.superseded = 0
+        # submit -> done, i.e. queueing time plus the request round trip
+        self.latency = LatencyHistogram()
+
+    @property
+    def queue_depth(self):
+        """Commands waiting to be sent (in-flight ones excluded)."""
+        return sum(len(queue) for queue in self._queues.values())
+
+    def as_dict(self):
+        return {
+            "queue_depth": self.queue_depth,
+            "busy_outputs": len(self._workers),
+            "completed": self.completed,
+            "failed": self.failed,
+            "superseded": self.superseded,
+            "latency": self.latency.as_dict(),
+        }
+
+    def is_busy(self, output_id):
+        """True while commands for this output are queued or in flight."""
+        return output_id in self._workers
+
+    def settled_at(self, output_id):
+        """Monotonic time the last command for this output finished (0 if none has)."""
+        return self._settled.get(output_id, 0)
+
+    @callback
+    def async_submit(self, output_id, kind, send, *args):
+        queue = self._queues.setdefault(output_id, {})
+        previous = queue.pop(kind, None)
+        if previous is not None:
+            self.superseded += 1
+            if not previous.future.done():
+                previous.future.set_result(None)
+        future = self._hass.loop.create_future()
+        queue[kind] = _Command(send, args, time.monotonic(), future)
+        if output_id not in self._workers:
+            self._workers[output_id] = self._hass.async_create_task(self._async_run(output_id))
+        return future
+
+    async def _async_run(self, output_id):
+        queue = self._queues[output_id]
+        command = None
+        try:
+            while queue:
+                kind = next(iter(queue))
+                command = queue.pop(kind)
+                async with self._limit:
+                    try:
+                        await command.send(*command.args)
+                        ok = True
+                    except Exception as e:
+                        _LOGGER.warning(f"MHUB {kind} command for output {output_id} failed: {e}")
+                        ok = False
+                latency = time.monotonic() - command.queued_at
+                self.latency.record(latency)
+                if ok:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+                _LOGGER.debug(
+                    "MHUB %s %s done in %.3fs (queue depth %s)",
+                    kind, command.args, latency, self.queue_depth,
+                )
+                if not command.future.done():
+                    command.future.set_result(ok)
+        finally:
+            if command is not None and not command.future.done():
+                command.future.cancel()
+            self._workers.pop(output_id, None)
+            self._queues.pop(output_id, None)
+            self._settled[output_id] = time.monotonic()
+            if not self._workers and self._on_idle is not None:
+                self._on_idle()
+
+    async def async_shutdown(self):
+        self._on_idle = None
+        for queue in self._queues.values():
+            for command in queue.values():
+                command.future.cancel()
+        workers = list(self._workers.values())
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
@@ -1,9 +1,21 @@
 from homeassistant import config_entries
+from homeassistant.components import network
+from homeassistant.core import callback
 import voluptuous as vol
-import aiohttp
-import async_timeout
 import logging
-from .const import DOMAIN
+from .api import MHUBApiClient
+from .discovery import async_discover, scan_hosts
+from .const import (
+    DOMAIN,
+    CONF_ACTIVE_WINDOW,
+    CONF_FAST_INTERVAL,
+    CONF_IDLE_INTERVAL,
+    CONF_MAX_BACKOFF,
+    DEFAULT_ACTIVE_WINDOW,
+    DEFAULT_FAST_INTERVAL,
+    DEFAULT_IDLE_INTERVAL,
+    DEFAULT_MAX_BACKOFF,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -11,26 +23,99 @@ class MHUBConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     VERSION = 1
     CONNECTION_CLASS = config_entries.CONN_CLASS_LOCAL_POLL
 
+    def __init__(self):
+        self._discovered = {}
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        return MHUBOptionsFlow(config_entry)
+
     async def async_step_user(self, user_input=None):
         errors = {}
         if user_input is not None:
             host = user_input.get("host", "").strip()
-            url = f"http://{host}/api/data/100/"
-            headers = {"User-Agent": "curl/8.0", "Accept": "application/json"}
+            if not host:
+                # no address given: search the local network instead
+                return await self.async_step_discover()
+            client = MHUBApiClient(host)
             try:
-                async with aiohttp.ClientSession(headers=headers) as session:
-                    with async_timeout.timeout(8):
-                        async with session.get(url, allow_redirects=True) as resp:
-                            if resp.status != 200:
-                                raise Exception(f"HTTP {resp.status}")
-                            data = await resp.json(content_type=None)
-                            if "header" in data and "version" in data["header"]:
-                                title = data.get("data", {}).get("mhub", {}).get("mhub_official_name", host)
-                                return self.async_create_entry(title=title, data={"host": host})
-                            raise Exception("Invalid JSON")
+                # one attempt: a mistyped host should fail within a single deadline
+                data = await client.async_get_data(100, retries=0)
+                if "header" in data and "version" in data["header"]:
+                    title = data.get("data", {}).get("mhub", {}).get("mhub_official_name", host)
+                    return self.async_create_entry(title=title, data={"host": host})
+                raise Exception("Invalid JSON")
             except Exception as e:
                 _LOGGER.debug("Config flow connect failed: %s", e)
                 errors["base"] = "cannot_connect"
+            finally:
+                await client.async_close()
 
-        data_schema = vol.Schema({vol.Required("host"): str})
+        data_schema = vol.Schema({vol.Optional("host", default=""): str})
         return self.async_show_form(step_id="user", data_schema=data_schema, errors=errors)
+
+    async def async_step_discover(self, user_input=None):
+        if user_input is not None:
+            hub = self._discovered[user_input["host"]]
+            return self.async_create_entry(title=hub.name, data={"host": hub.host})
+
+        adapters = await network.async_get_adapters(self.hass)
+        interfaces = [
+            f"{ip['address']}/{ip['network_prefix']}"
+            for adapter in adapters
+            if adapter["enabled"]
+            for ip in adapter["ipv4"]
+        ]
+        configured = {entry.data.get("host") for entry in self._async_current_entries()}
+        hubs = await async_discover(scan_hosts(interfaces))
+        _LOGGER.debug("MHUB discovery on %s found %s", interfaces, hubs)
+        self._discovered = {hub.host: hub for hub in hubs if hub.host not in configured}
+        if not self._discovered:
+            return self.async_show_form(
+                step_id="user",
+                data_schema=vol.Schema({vol.Optional("host", default=""): str}),
+                errors={"base": "no_devices_found"},
+            )
+        data_schema = vol.Schema(
+            {
+                vol.Required("host"): vol.In(
+                    {host: f"{hub.name} ({host})" for host, hub in self._discovered.items()}
+                )
+            }
+        )
+        return self.async_show_form(step_id="discover", data_schema=data_schema)
+
+
+class MHUBOptionsFlow(config_entries.OptionsFlow):
+    """Adaptive polling bounds."""
+
+    def __init__(self, config_entry):
+        self._entry = config_entry
+
+    async def async_step_init(self, user_input=None):
+        errors = {}
+        if user_input is not None:
+            if user_input[CONF_FAST_INTERVAL] > user_input[CONF_IDLE_INTERVAL]:
+                errors["base"] = "fast_slower_than_idle"
+            else:
+                return self.async_create_entry(title="", data=user_input)
+
+        options = self._entry.options
+        data_schema = vol.Schema(
+            {
+                vol.Required(
+                    CONF_FAST_INTERVAL, default=options.get(CONF_FAST_INTERVAL, DEFAULT_FAST_INTERVAL)
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=60)),
+                vol.Required(
+                    CONF_IDLE_INTERVAL, default=options.get(CONF_IDLE_INTERVAL, DEFAULT_IDLE_INTERVAL)
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=600)),
+                vol.Required(
+                    CONF_ACTIVE_WINDOW, default=options.get(CONF_ACTIVE_WINDOW, DEFAULT_ACTIVE_WINDOW)
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=3600)),
+                vol.Required(
+                    CONF_MAX_BACKOFF, default=options.get(CONF_MAX_BACKOFF, DEFAULT_MAX_BACKOFF)
+                ): vol.All(vol.Coerce(int), vol.Range(min=10, max=3600)),
+            }
+        )
+        return self.async_show_form(step_id="init", data_schema=data_schema, errors=errors)
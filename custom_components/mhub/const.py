@@ -1,2 +1,42 @@
 DOMAIN = "mhub"
-DEFAULT_SCAN_INTERVAL = 10
+
+# adaptive polling (seconds), configurable through the options flow
+CONF_FAST_INTERVAL = "fast_interval"
+CONF_IDLE_INTERVAL = "idle_interval"
+CONF_ACTIVE_WINDOW = "active_window"
+CONF_MAX_BACKOFF = "max_backoff"
+DEFAULT_FAST_INTERVAL = 3
+DEFAULT_IDLE_INTERVAL = 30
+DEFAULT_ACTIVE_WINDOW = 60
+DEFAULT_MAX_BACKOFF = 300
+# static device info (/api/data/100/) is refreshed on this slower cadence
+INFO_REFRESH_INTERVAL = 300
+# per hub; all hubs share one pool bounded by GLOBAL_MAX_CONNECTIONS
+DEFAULT_MAX_CONNECTIONS = 4
+GLOBAL_MAX_CONNECTIONS = 64
+STORAGE_VERSION = 1
+# commands for different outputs sent in parallel (same output is always serialized)
+DEFAULT_COMMAND_CONCURRENCY = 4
+# delay before the state-only poll that confirms optimistic command results
+VERIFY_DELAY = 1.5
+# per-request deadlines (seconds) by endpoint, including the wait for a pooled connection
+REQUEST_DEADLINES = {"data/100": 8, "data/200": 5}
+DEFAULT_REQUEST_DEADLINE = 4
+# idempotent reads are retried with jittered exponential backoff; commands are not
+READ_RETRIES = 2
+RETRY_BACKOFF = 0.25
+# upper bound for one whole refresh: the worst case is a fully retried /200 followed by a fully
+# retried /100 (zone layout change), so every attempt can run to its own deadline
+POLL_DEADLINE = (READ_RETRIES + 1) * (
+    REQUEST_DEADLINES["data/200"] + REQUEST_DEADLINES["data/100"]
+) + 2 * RETRY_BACKOFF * (2**READ_RETRIES - 1)
+# circuit breaker: open after this many consecutive failures, let one probe through after BREAKER_RESET s
+BREAKER_THRESHOLD = 3
+BREAKER_RESET = 30
+# volume ramps: requests per second per hub shared by all running fades, default fade length (s)
+RAMP_MAX_RATE = 10
+DEFAULT_RAMP_DURATION = 3
+# LAN discovery: parallel probes, per-host timeout (s); larger subnets are narrowed to /24 around the interface
+DISCOVERY_CONCURRENCY = 64
+DISCOVERY_TIMEOUT = 1.0
+DISCOVERY_MIN_PREFIX = 24
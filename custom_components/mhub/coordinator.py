@@ -1,23 +1,78 @@
 from datetime import timedelta
+import asyncio
+import contextlib
+import random
+import time
+from homeassistant.core import callback
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
-import aiohttp, async_timeout, logging, json
-from .const import DOMAIN, DEFAULT_SCAN_INTERVAL
+import logging
+from .api import MHUBApiClient, MHUBApiError, MHUBUnavailableError
+from .commands import CommandScheduler
+from .models import DeviceInfo, MHUBSnapshot, OutputState, RoutingIndex, changed_outputs
+from .polling import hub_phase, next_slot
+from .ramps import VolumeRamper
+from .stats import LatencyHistogram
+from .const import (
+    DOMAIN,
+    CONF_ACTIVE_WINDOW,
+    CONF_FAST_INTERVAL,
+    CONF_IDLE_INTERVAL,
+    CONF_MAX_BACKOFF,
+    DEFAULT_ACTIVE_WINDOW,
+    DEFAULT_FAST_INTERVAL,
+    DEFAULT_IDLE_INTERVAL,
+    DEFAULT_MAX_BACKOFF,
+    INFO_REFRESH_INTERVAL,
+    POLL_DEADLINE,
+    STORAGE_VERSION,
+    VERIFY_DELAY,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
 class MHUBDataUpdateCoordinator(DataUpdateCoordinator):
     """Manages polling data from the HDAnywhere MHUB device and auto-detects model capabilities."""
 
-    def __init__(self, hass, entry):
+    def __init__(self, hass, entry, session=None):
         self.hass = hass
+        self.entry = entry
         self.host = entry.data["host"]
+        self.api = MHUBApiClient(self.host, session)
         super().__init__(
             hass,
             _LOGGER,
-            name="MHUB Data Coordinator",
-            update_interval=timedelta(seconds=DEFAULT_SCAN_INTERVAL),
+            name=f"MHUB Data Coordinator ({self.host})",
+            update_interval=timedelta(seconds=DEFAULT_FAST_INTERVAL),
         )
-        self.data = {"info": {}, "state": {}}
+        # adaptive polling: fast for a window after activity, slow when idle, backoff when offline
+        self._intervals = {}
+        self.async_apply_options(entry.options)
+        self._active_until = time.monotonic() + self._intervals[CONF_ACTIVE_WINDOW]
+        self._failures = 0
+        # stable per-hub poll slot so many hubs don't poll in lockstep
+        self._phase = hub_phase(entry.entry_id)
+        # whole-refresh instrumentation (per-request counters live on self.api.stats)
+        self.poll_latency = LatencyHistogram()
+        self.poll_failures = 0
+        self.poll_timeouts = 0
+        self.data = MHUBSnapshot(DeviceInfo())
+        # False while entities only have the startup cache (no zone state yet)
+        self.live = False
+        self.index = RoutingIndex()
+        # outputs whose slice changed in the last refresh; None means "notify everyone"
+        self.changed_outputs = None
+        # ordered per-output command queue; superseded commands are dropped
+        self.commands = CommandScheduler(hass, on_idle=self._async_commands_idle)
+        # commands are applied optimistically and confirmed by one debounced state poll
+        self._expected = {}
+        self._verify_debouncer = Debouncer(
+            hass, _LOGGER, cooldown=VERIFY_DELAY, immediate=False, function=self.async_refresh
+        )
+        # bulk operations refresh once themselves instead of per queue drain
+        self._bulk_operations = 0
+        self.ramps = VolumeRamper(self)
         self.model_info = {
             "model": None,
             "api_version": None,
@@ -27,90 +82,335 @@ class MHUBDataUpdateCoordinator(DataUpdateCoordinator):
             "inputs": 0,
             "outputs": 0,
         }
+        # capabilities are probed once per firmware and persisted across restarts
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}")
+        self._capabilities = {}
+        # tiered refresh: /200 every poll, /100 only when due, requested or the zone layout changes
+        self._info_fetched_at = None
+        self._info_requested = True
+        self._zone_fingerprint = None
+
+    async def async_load_cache(self):
+        """Restore the capabilities and device info persisted on a previous run.
+
+        Returns True when the cache is complete enough to create every entity
+        without waiting for the hub.
+        """
+        stored = await self._store.async_load() or {}
+        self._capabilities = stored.get("capabilities") or {}
+        if self._capabilities:
+            self.model_info.update(self._capabilities)
+        if not stored.get("device"):
+            return False
+        try:
+            device = DeviceInfo.from_dict(stored["device"])
+        except (TypeError, ValueError) as e:
+            _LOGGER.warning("Ignoring unreadable MHUB device cache: %s", e)
+            return False
+        self.data = MHUBSnapshot(device)
+        self.index = RoutingIndex.build(device, ())
+        return bool(self._capabilities)
+
+    async def _async_save_cache(self):
+        await self._store.async_save(
+            {"capabilities": self._capabilities, "device": self.data.device.as_dict()}
+        )
+
+    async def async_close(self):
+        self._verify_debouncer.async_cancel()
+        await self.ramps.async_shutdown()
+        await self.commands.async_shutdown()
+        await self.api.async_close()
+
+    @callback
+    def async_apply_options(self, options):
+        self._intervals = {
+            CONF_FAST_INTERVAL: options.get(CONF_FAST_INTERVAL, DEFAULT_FAST_INTERVAL),
+            CONF_IDLE_INTERVAL: options.get(CONF_IDLE_INTERVAL, DEFAULT_IDLE_INTERVAL),
+            CONF_ACTIVE_WINDOW: options.get(CONF_ACTIVE_WINDOW, DEFAULT_ACTIVE_WINDOW),
+            CONF_MAX_BACKOFF: options.get(CONF_MAX_BACKOFF, DEFAULT_MAX_BACKOFF),
+        }
+
+    @callback
+    def async_mark_activity(self):
+        """Poll fast for the active window (after commands or detected changes)."""
+        self._active_until = time.monotonic() + self._intervals[CONF_ACTIVE_WINDOW]
+        if self.update_interval != timedelta(seconds=self._intervals[CONF_FAST_INTERVAL]):
+            self.update_interval = timedelta(seconds=self._intervals[CONF_FAST_INTERVAL])
+
+    def _next_interval(self, failed, refused=False):
+        fast = self._intervals[CONF_FAST_INTERVAL]
+        if refused:
+            # the breaker refused the poll without contacting the hub: not a failed poll for the
+            # backoff; try again once the breaker lets a probe through
+            return max(fast, self.api.breaker.retry_in)
+        if failed:
+            # exponential backoff with jitter while the hub is unreachable
+            self._failures += 1
+            delay = min(self._intervals[CONF_MAX_BACKOFF], fast * 2 ** self._failures)
+            return delay / 2 + random.uniform(0, delay / 2)
+        if self._failures:
+            # just recovered: catch up quickly
+            self._failures = 0
+            self._active_until = time.monotonic() + self._intervals[CONF_ACTIVE_WINDOW]
+        interval = fast if time.monotonic() < self._active_until else self._intervals[CONF_IDLE_INTERVAL]
+        now = self.hass.loop.time()
+        # DataUpdateCoordinator fires at int(now) plus its own sub-second stagger plus update_interval
+        return next_slot(now, interval, self._phase) - int(now) - getattr(self, "_microsecond", 0)
+
+    @callback
+    def _async_apply_optimistic(self, output_id, **changes):
+        """Show a commanded change immediately; the next poll confirms or rolls it back."""
+        current = self.index.output(output_id) or OutputState(output_id)
+        self._expected.setdefault(output_id, {}).update(changes)
+        self.index = self.index.with_output(current.replace(**changes))
+        self.changed_outputs = frozenset((output_id,))
+        self.async_mark_activity()
+        self.async_update_listeners()
+
+    @callback
+    def async_switch(self, output_id, input_id):
+        self._async_apply_optimistic(output_id, input_id=str(input_id))
+        return self.commands.async_submit(output_id, "switch", self.api.async_switch, output_id, input_id)
+
+    @callback
+    def async_set_volume(self, output_id, volume, ramp=False):
+        if not ramp:
+            # a direct volume command takes the output over from a running fade
+            self.ramps.async_release(output_id)
+        self._async_apply_optimistic(output_id, volume=int(volume))
+        return self.commands.async_submit(output_id, "volume", self.api.async_set_volume, output_id, int(volume))
+
+    @callback
+    def async_set_mute(self, output_id, mute):
+        self._async_apply_optimistic(output_id, mute=bool(mute))
+        return self.commands.async_submit(output_id, "mute", self.api.async_set_mute, output_id, bool(mute))
+
+    @callback
+    def async_power(self, value):
+        return self.commands.async_submit(None, "power", self.api.async_power, value)
+
+    @callback
+    def async_system_power(self, value, send=None):
+        """Queue a full-system power command; ``send`` may wrap the API call to inspect failures."""
+        return self.commands.async_submit(None, "system_power", send or self.api.async_system_power, value)
+
+    @callback
+    def _async_commands_idle(self):
+        if not self._bulk_operations:
+            self.hass.async_create_task(self._verify_debouncer.async_call())
+
+    @contextlib.contextmanager
+    def bulk_operation(self):
+        """Suppress the per-drain verification poll; the caller refreshes once when done."""
+        self._bulk_operations += 1
+        try:
+            yield
+        finally:
+            self._bulk_operations -= 1
+
+    async def async_refresh_after_bulk(self):
+        self._verify_debouncer.async_cancel()
+        await self.async_refresh()
+
+    async def async_apply_bulk(self, outputs):
+        """Apply {output_id: {input, volume, mute}} concurrently, then refresh once.
+
+        Returns {output_id: bool}, True when every command for that output was sent.
+        """
+        with self.bulk_operation():
+            pending = {}
+            for output_id, spec in outputs.items():
+                futures = []
+                if spec.get("input") is not None:
+                    futures.append(self.async_switch(output_id, spec["input"]))
+                if spec.get("volume") is not None:
+                    futures.append(self.async_set_volume(output_id, spec["volume"]))
+                if spec.get("mute") is not None:
+                    futures.append(self.async_set_mute(output_id, spec["mute"]))
+                pending[output_id] = asyncio.gather(*futures)
+            results = {}
+            for output_id, future in pending.items():
+                results[output_id] = all(ok is True for ok in await future)
+        await self.async_refresh_after_bulk()
+        return results
+
+    def diagnostics(self):
+        """Hot-path counters for diagnostics and the diagnostic sensors."""
+        return {
+            "update_interval_s": self.update_interval.total_seconds() if self.update_interval else None,
+            "consecutive_failures": self._failures,
+            "poll": {
+                "latency": self.poll_latency.as_dict(),
+                "failures": self.poll_failures,
+                "timeouts": self.poll_timeouts,
+            },
+            "circuit_breaker": self.api.breaker.as_dict(),
+            "requests": self.api.stats.as_dict(),
+            "commands": self.commands.as_dict(),
+            "ramps": self.ramps.as_dict(),
+        }
+
+    @property
+    def scenes(self):
+        return self.entry.data.get("scenes", {})
+
+    def routing_snapshot(self):
+        return {
+            output_id: {"input": state.input_id, "volume": state.volume, "mute": state.mute}
+            for output_id, state in self.index.outputs.items()
+        }
+
+    @callback
+    def async_save_scene(self, name, outputs):
+        scenes = {**self.scenes, name: outputs}
+        self.hass.config_entries.async_update_entry(self.entry, data={**self.entry.data, "scenes": scenes})
+
+    def _reconcile(self, index, started):
+        """Check optimistic values against an index polled from ``started`` on.
+
+        Outputs whose commands are still being sent, or finished only after
+        the poll started (its /200 may predate them), keep the commanded value.
+        """
+        for output_id, expected in list(self._expected.items()):
+            actual = index.output(output_id)
+            if self.commands.is_busy(output_id) or self.commands.settled_at(output_id) > started:
+                # not yet reflected in this poll: keep showing the commanded value
+                index = index.with_output((actual or OutputState(output_id)).replace(**expected))
+                continue
+            del self._expected[output_id]
+            if actual is None or any(getattr(actual, k) != v for k, v in expected.items()):
+                _LOGGER.warning(
+                    "MHUB output %s did not confirm %s, rolling back to %s", output_id, expected, actual
+                )
+        return index
+
+    async def async_request_info_refresh(self):
+        """Refetch the static device info (labels, model) on the next refresh."""
+        self._info_requested = True
+        await self.async_request_refresh()
+
+    def _info_due(self):
+        if self._info_requested or self._info_fetched_at is None:
+            return True
+        return time.monotonic() - self._info_fetched_at >= INFO_REFRESH_INTERVAL
+
+    @staticmethod
+    def _fingerprint(zones):
+        """Cheap layout fingerprint of the zone state: the set of reported outputs."""
+        return frozenset(s.output_id for z in zones for s in z.outputs)
+
+    @staticmethod
+    def _results(results):
+        """Unpack gathered reads; a real failure wins over a sibling the breaker then refused."""
+        errors = [r for r in results if isinstance(r, BaseException)]
+        if errors:
+            raise min(errors, key=lambda e: isinstance(e, MHUBUnavailableError))
+        return results
+
+    def output_changed(self, output_id):
+        """True if the last refresh changed this output (or everything must be rewritten)."""
+        return self.changed_outputs is None or output_id in self.changed_outputs
 
     async def _async_update_data(self):
-        base = f"http://{self.host}/api/data"
-        headers = {"User-Agent": "curl/8.0", "Accept": "application/json"}
-
-        async with aiohttp.ClientSession(headers=headers) as s:
-            try:
-                with async_timeout.timeout(10):
-                    async with s.get(f"{base}/100/", allow_redirects=True) as r1:
-                        raw1 = await r1.text()
-                        info = await self._safe_json(r1, raw1)
-                    async with s.get(f"{base}/200/", allow_redirects=True) as r2:
-                        raw2 = await r2.text()
-                        state = await self._safe_json(r2, raw2)
-                if not info or not state:
-                    raise UpdateFailed("Empty response from MHUB")
-                # store
-                self.data = {"info": info.get("data", {}), "state": state.get("data", {})}
-                # run detection
-                self._detect_model()
-                _LOGGER.debug("MHUB data updated: model=%s", self.model_info.get("model"))
-                return self.data
-            except Exception as e:
-                _LOGGER.error("MHUB update failed: %s", e)
-                raise UpdateFailed(str(e))
-
-    async def _safe_json(self, resp, raw):
+        # the first live refresh after a cached startup rewrites everything, like a recovery
+        recovering = not self.last_update_success or not self.live
+        started = time.monotonic()
         try:
-            return await resp.json(content_type=None)
-        except Exception:
-            try:
-                return json.loads(raw)
-            except Exception as e:
-                _LOGGER.error("JSON decode error: %s\nRaw: %s", e, raw[:400])
-                return {}
-
-    def _detect_model(self):
+            device = None
+            async with asyncio.timeout(POLL_DEADLINE):
+                info_due = self._info_due()
+                if info_due and self.api.breaker.state == "closed":
+                    device, zones = self._results(
+                        await asyncio.gather(
+                            self.api.async_get_device_info(),
+                            self.api.async_get_zones(),
+                            return_exceptions=True,
+                        )
+                    )
+                else:
+                    # while the breaker is not closed /200 goes alone as its single probe
+                    zones = await self.api.async_get_zones()
+                fingerprint = self._fingerprint(zones)
+                if device is None and (info_due or fingerprint != self._zone_fingerprint):
+                    if not info_due:
+                        _LOGGER.debug("MHUB zone layout changed, refreshing device info")
+                    device = await self.api.async_get_device_info()
+            self._zone_fingerprint = fingerprint
+            info_changed = False
+            if device is not None:
+                self._info_fetched_at = time.monotonic()
+                self._info_requested = False
+                info_changed = device != self.data.device
+                self.data = MHUBSnapshot(device, zones)
+                # probe capabilities only on first run or after a firmware change
+                if not self._capabilities or self._capabilities.get("firmware") != device.firmware:
+                    await self._async_detect_model(device)
+                elif info_changed:
+                    await self._async_save_cache()
+            else:
+                self.data = MHUBSnapshot(self.data.device, zones)
+            index = RoutingIndex.build(self.data.device, zones, self.index)
+            if self._expected:
+                index = self._reconcile(index, started)
+            if recovering or info_changed:
+                self.changed_outputs = None
+            else:
+                self.changed_outputs = changed_outputs(self.index, index)
+            self.index = index
+            if self.changed_outputs is None or self.changed_outputs:
+                self._active_until = time.monotonic() + self._intervals[CONF_ACTIVE_WINDOW]
+            self.update_interval = timedelta(seconds=self._next_interval(False))
+            self.poll_latency.record(time.monotonic() - started)
+            self.live = True
+            _LOGGER.debug("MHUB data updated: model=%s", self.model_info.get("model"))
+            return self.data
+        except Exception as e:
+            if isinstance(e, asyncio.TimeoutError) and not isinstance(e, MHUBApiError):
+                # the whole-refresh deadline; request timeouts are already counted per endpoint
+                self.poll_timeouts += 1
+            else:
+                self.poll_failures += 1
+            # availability flips for every entity
+            self.changed_outputs = None
+            refused = isinstance(e, MHUBUnavailableError)
+            self.update_interval = timedelta(seconds=self._next_interval(True, refused))
+            if self._failures == 1 and not refused:
+                _LOGGER.warning("MHUB update failed: %s", e)
+            else:
+                _LOGGER.debug(
+                    "MHUB still unreachable (%s failures, next try in %.0fs): %s",
+                    self._failures, self.update_interval.total_seconds(), e,
+                )
+            raise UpdateFailed(str(e))
+
+    async def _async_detect_model(self, device):
+        fw = device.firmware
         try:
-            mhub = self.data.get("info", {}).get("mhub", {})
-            model = mhub.get("mhub_official_name") or mhub.get("mhub_name")
-            api = mhub.get("api")
-            fw = mhub.get("mhub-os_version") or mhub.get("mhub_firmware")
-            self.model_info["model"] = model
-            self.model_info["api_version"] = api
+            self.model_info["model"] = device.model
+            self.model_info["api_version"] = device.api_version
             self.model_info["firmware"] = fw
-            # detect audio support
-            io = self.data.get("info", {}).get("io_data", {})
-            outputs = io.get("output_audio") or io.get("output_audio_mirror") or []
-            inputs = io.get("input_audio") or io.get("input_audio_mirror") or []
-            self.model_info["supports_audio"] = bool(outputs or inputs)
-            # counts
-            iv = io.get("input_video") or []
-            ov = io.get("output_video") or []
-            try:
-                self.model_info["inputs"] = int(iv[0].get("ports")) if iv else 0
-            except Exception:
-                self.model_info["inputs"] = len(iv)
-            try:
-                self.model_info["outputs"] = int(ov[0].get("ports")) if ov else 0
-            except Exception:
-                self.model_info["outputs"] = len(ov)
+            self.model_info["supports_audio"] = device.supports_audio
+            self.model_info["inputs"] = device.input_ports
+            self.model_info["outputs"] = device.output_ports
             # detect power endpoint presence by probing a known endpoint (non-fatal)
-            try:
-                import requests
-                url = f"http://{self.host}/api/control/power/a/1/"
-                resp = requests.get(url, timeout=2)
-                self.model_info["supports_power"] = (resp.status_code == 200)
-            except Exception:
-                # assume no power control (safe fallback)
-                self.model_info["supports_power"] = False
+            self.model_info["supports_power"] = await self.api.async_probe_power()
         except Exception as e:
-            _LOGGER.warning("Model detect error: %s", e)
-            self.model_info = self.model_info
+            # no answer from the hub: keep the capabilities unsaved so the next /100 fetch probes again
+            _LOGGER.warning("Model detect error, will retry: %s", e)
+            return
+        self._capabilities = dict(self.model_info)
+        await self._async_save_cache()
+        _LOGGER.debug("MHUB capabilities detected for firmware %s: %s", fw, self._capabilities)
 
     def zones(self):
-        return self.data.get("state", {}).get("zones", []) or []
+        return self.data.zones
 
     def output_labels(self):
-        mapping = {}
-        try:
-            outs = self.data.get("info", {}).get("io_data", {}).get("output_video", [])
-            for o in outs:
-                for l in o.get("labels", []):
-                    mapping[str(l.get("id"))] = l.get("label")
-        except Exception as e:
-            _LOGGER.warning("Output parse error: %s", e)
-        return mapping
+        return {lbl.id: lbl.label for lbl in self.data.device.outputs}
+
+    def audio_output_labels(self):
+        return {lbl.id: lbl.label for lbl in self.data.device.audio_outputs}
+
+    def is_audio_output(self, output_id):
+        return any(lbl.id.lower() == output_id for lbl in self.data.device.audio_outputs)
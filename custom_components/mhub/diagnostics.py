@@ -0,0 +1,24 @@
+"""Diagnostics support for the MHUB integration."""
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+TO_REDACT = {"host"}
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry):
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    return {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "model_info": coordinator.model_info,
+        "outputs": len(coordinator.index.outputs),
+        "inputs": len(coordinator.index.video.labels),
+        "audio_inputs": len(coordinator.index.audio.labels),
+        "last_update_success": coordinator.last_update_success,
+        "performance": coordinator.diagnostics(),
+    }
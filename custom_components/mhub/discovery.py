@@ -0,0 +1,72 @@
+"""Concurrent LAN scan for hubs answering the MHUB /api/data/100/ fingerprint."""
+import asyncio
+from dataclasses import dataclass
+import ipaddress
+
+import aiohttp
+
+from .api import HEADERS, _loads
+from .const import DISCOVERY_CONCURRENCY, DISCOVERY_MIN_PREFIX, DISCOVERY_TIMEOUT
+
+
+@dataclass(slots=True, frozen=True)
+class DiscoveredHub:
+    host: str
+    name: str
+
+
+def scan_hosts(interfaces, min_prefix=DISCOVERY_MIN_PREFIX):
+    """Host addresses to probe for interface addresses like "192.168.1.20/16".
+
+    Subnets wider than ``min_prefix`` are narrowed to the ``min_prefix``
+    block around the interface address; loopback and link-local are skipped.
+    """
+    networks = []
+    for interface in interfaces:
+        iface = ipaddress.ip_interface(interface)
+        if iface.version != 4 or iface.is_loopback or iface.is_link_local:
+            continue
+        prefix = max(iface.network.prefixlen, min_prefix)
+        network = ipaddress.ip_network(f"{iface.ip}/{prefix}", strict=False)
+        if network not in networks:
+            networks.append(network)
+    return [str(host) for network in networks for host in network.hosts()]
+
+
+def fingerprint(document, host):
+    """DiscoveredHub for a /api/data/100/ document, or None if it is not an MHUB."""
+    if not isinstance(document, dict):
+        return None
+    if "version" not in (document.get("header") or {}):
+        return None
+    mhub = (document.get("data") or {}).get("mhub")
+    if not isinstance(mhub, dict):
+        return None
+    return DiscoveredHub(host, mhub.get("mhub_official_name") or mhub.get("mhub_name") or host)
+
+
+async def _async_probe(session, host, limit, timeout):
+    async with limit:
+        try:
+            async with session.get(
+                f"http://{host}/api/data/100/", timeout=aiohttp.ClientTimeout(total=timeout)
+            ) as resp:
+                if resp.status != 200:
+                    return None
+                body = await resp.read()
+            return fingerprint(_loads(body), host)
+        except (aiohttp.ClientError, asyncio.TimeoutError, OSError, ValueError):
+            return None
+
+
+async def async_discover(hosts, concurrency=DISCOVERY_CONCURRENCY, timeout=DISCOVERY_TIMEOUT):
+    """Probe ``hosts`` ("ip" or "ip:port") concurrently; return the MHUBs found, in input order.
+
+    At most ``concurrency`` probes are in flight and each gets ``timeout``
+    seconds, so a /24 takes at most about four timeouts.
+    """
+    limit = asyncio.Semaphore(concurrency)
+    connector = aiohttp.TCPConnector(limit=concurrency, force_close=True)
+    async with aiohttp.ClientSession(connector=connector, headers=HEADERS) as session:
+        found = await asyncio.gather(*(_async_probe(session, host, limit, timeout) for host in hosts))
+    return [hub for hub in found if hub is not None]
@@ -0,0 +1,53 @@
+"""Base entity for the MHUB platforms."""
+from homeassistant.core import callback
+from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN
+
+
+class MHUBEntity(CoordinatorEntity):
+    """Coordinator entity that only writes state when its slice of the hub changed.
+
+    Entities bound to an output pass its id; hub-wide entities leave it as
+    None and are only rewritten when everything is (availability, labels).
+    Every entity belongs to its hub's device and has a unique id namespaced
+    by the config entry, so several hubs can coexist.
+    """
+
+    # hub-wide entities that must be rewritten after every refresh (diagnostics)
+    _notify_always = False
+
+    def __init__(self, coordinator, output_id=None):
+        super().__init__(coordinator)
+        self._output_id = None if output_id is None else str(output_id).lower()
+        entry = coordinator.entry
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, entry.entry_id)},
+            name=entry.title,
+            manufacturer="HDAnywhere",
+            model=coordinator.model_info.get("model"),
+            sw_version=coordinator.model_info.get("firmware"),
+            configuration_url=f"http://{coordinator.host}",
+        )
+
+    @property
+    def available(self):
+        # entities created from the startup cache stay unavailable until the hub has answered
+        return self.coordinator.live and super().available
+
+    def _unique_id(self, suffix):
+        return f"{self.coordinator.entry.entry_id}_{suffix}"
+
+    def _update_from_index(self):
+        """Refresh cached attributes from coordinator.index before a state write."""
+
+    def _should_write(self):
+        return self._notify_always or self.coordinator.output_changed(self._output_id)
+
+    @callback
+    def _handle_coordinator_update(self):
+        if not self._should_write():
+            return
+        self._update_from_index()
+        super()._handle_coordinator_update()
@@ -3,10 +3,10 @@ from homeassistant.components.media_player import (
     MediaPlayerEntityFeature,
     MediaPlayerState,
 )
-import aiohttp
-import asyncio
+from homeassistant.exceptions import HomeAssistantError
 import logging
 from .const import DOMAIN
+from .entity import MHUBEntity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -17,125 +17,68 @@ async def async_setup_entry(hass, entry, async_add_entities):
     entities = []
     for output_id, output_label in outputs.items():
         entities.append(MHUBOutputEntity(coordinator, output_id, output_label))
-    async_add_entities(entities, True)
+    # audio zones of MHUB AUDIO / audio-capable models route from their own inputs
+    for output_id, output_label in coordinator.audio_output_labels().items():
+        entities.append(MHUBAudioZoneEntity(coordinator, output_id, output_label))
+    async_add_entities(entities)
 
 
-class MHUBOutputEntity(MediaPlayerEntity):
+class MHUBOutputEntity(MHUBEntity, MediaPlayerEntity):
     _attr_supported_features = (
         MediaPlayerEntityFeature.SELECT_SOURCE |
         MediaPlayerEntityFeature.TURN_ON |
         MediaPlayerEntityFeature.TURN_OFF
     )
     _attr_device_class = "tv"
+    _audio = False
+    _unique_prefix = "output"
 
     def __init__(self, coordinator, output_id, name):
-        self._coordinator = coordinator
-        self._output_id = str(output_id).lower()
+        super().__init__(coordinator, output_id)
         self._attr_name = name
-        self._attr_unique_id = f"mhub_output_{output_id}"
-        self._attr_source_list = []
+        self._attr_unique_id = self._unique_id(f"{self._unique_prefix}_{output_id}")
         self._attr_source = None
         self._attr_state = MediaPlayerState.OFF
+        self._update_from_index()
 
-    async def async_added_to_hass(self):
-        await self._coordinator.async_request_refresh()
-        self._load_sources()
-        self._update_power_state()
-        _LOGGER.debug(f"{self._attr_name} initialized: {self._attr_source_list}")
-
-    def _load_sources(self):
-        try:
-            inputs = self._coordinator.data.get("info", {}).get("io_data", {}).get("input_video", [])
-            if inputs and isinstance(inputs, list):
-                self._attr_source_list = [lbl["label"] for lbl in inputs[0].get("labels", [])]
-        except Exception:
-            self._attr_source_list = [f"Input {i}" for i in range(1, 9)]
+    def _update_from_index(self):
         self._attr_source = self._get_current_source()
+        self._update_power_state()
 
     def _get_current_source(self):
-        zones = self._coordinator.data.get("state", {}).get("zones", [])
-        for zone in zones:
-            for s in zone.get("state", []):
-                if str(s.get("output_id")).lower() == self._output_id:
-                    return self._input_label_from_id(s.get("input_id"))
-        return None
-
-    def _input_label_from_id(self, input_id):
-        inputs = self._coordinator.data.get("info", {}).get("io_data", {}).get("input_video", [])
-        if inputs:
-            for lbl in inputs[0].get("labels", []):
-                if str(lbl.get("id")) == str(input_id):
-                    return lbl.get("label")
-        return f"Input {input_id}"
-
-    def _input_id_from_label(self, label):
-        inputs = self._coordinator.data.get("info", {}).get("io_data", {}).get("input_video", [])
-        if inputs:
-            for lbl in inputs[0].get("labels", []):
-                if lbl.get("label") == label:
-                    return lbl.get("id")
-        return ''.join([c for c in label if c.isdigit()]) or "1"
+        state = self.coordinator.index.output(self._output_id)
+        if state is None:
+            return None
+        return self.coordinator.index.input_label(state.input_id, self._audio)
 
     def _update_power_state(self):
-        # soft-power: ON if any input_id > 0, else OFF
-        zones = self._coordinator.data.get("state", {}).get("zones", [])
-        active = False
-        for z in zones:
-            for s in z.get("state", []):
-                if str(s.get("output_id")).lower() == self._output_id:
-                    try:
-                        if int(s.get("input_id", 0)) > 0:
-                            active = True
-                    except Exception:
-                        active = True
+        state = self.coordinator.index.output(self._output_id)
+        active = state is not None and state.active
         self._attr_state = MediaPlayerState.ON if active else MediaPlayerState.OFF
 
     async def async_turn_on(self):
-        # soft on: just set state and refresh
+        # soft on: just set state (no API)
         self._attr_state = MediaPlayerState.ON
         self.async_write_ha_state()
-        await self._coordinator.async_request_refresh()
-        self._load_sources()
 
     async def async_turn_off(self):
-        # soft off: set an internal state (no API) and refresh
+        # soft off: set an internal state (no API)
         self._attr_state = MediaPlayerState.OFF
         self.async_write_ha_state()
-        await self._coordinator.async_request_refresh()
 
     async def async_select_source(self, source):
-        input_id = self._input_id_from_label(source)
+        input_id = self.coordinator.index.input_id(source, self._audio)
+        if input_id is None:
+            raise HomeAssistantError(f"Unknown MHUB source: {source}")
         output_id = self._output_id
-        url = f"http://{self._coordinator.host}/api/control/switch/{output_id}/{input_id}/"
-        headers = {"User-Agent": "curl/8.0", "Accept": "application/json"}
         _LOGGER.info(f"Switching Output {output_id.upper()} -> Input {input_id}")
-        asyncio.create_task(self._async_send_switch(url, source, output_id, input_id, headers))
-
-    async def _async_send_switch(self, url, source, output_id, input_id, headers):
-        try:
-            async with aiohttp.ClientSession(headers=headers) as session:
-                async with session.get(url, allow_redirects=True) as resp:
-                    text = await resp.text()
-                    if resp.status == 200:
-                        _LOGGER.info(f"MHUB switched: {output_id.upper()} -> {input_id}")
-                        self._attr_source = source
-                        self._attr_state = MediaPlayerState.ON
-                        self.async_write_ha_state()
-                    else:
-                        _LOGGER.warning(f"Switch failed HTTP {resp.status}: {text}")
-        except Exception as e:
-            _LOGGER.error(f"Switch request failed: {e}")
-        await self._coordinator.async_request_refresh()
-        self._load_sources()
-
-    async def async_update(self):
-        await self._coordinator.async_request_refresh()
-        self._load_sources()
-        self._update_power_state()
+        # shown immediately, queued per output: a newer selection supersedes one not yet sent
+        self.coordinator.async_switch(output_id, input_id)
 
     @property
     def source_list(self):
-        return self._attr_source_list
+        # shared by all outputs; rebuilt only when the hub's input labels change
+        return self.coordinator.index.sources(self._audio).source_list
 
     @property
     def source(self):
@@ -149,6 +92,14 @@ class MHUBOutputEntity(MediaPlayerEntity):
     def extra_state_attributes(self):
         return {
             "Output": self._output_id.upper(),
-            "Model": self._coordinator.model_info.get("model"),
-            "Firmware": self._coordinator.model_info.get("firmware"),
+            "Model": self.coordinator.model_info.get("model"),
+            "Firmware": self.coordinator.model_info.get("firmware"),
         }
+
+
+class MHUBAudioZoneEntity(MHUBOutputEntity):
+    """Audio zone: routed from the audio inputs, reported in the same zone poll."""
+
+    _attr_device_class = "speaker"
+    _audio = True
+    _unique_prefix = "audio_output"
@@ -0,0 +1,302 @@
+"""Compact typed snapshot of the MHUB data documents and the lookup index built from it.
+
+Each /api/data/ document is decoded once and immediately converted into
+these slotted, immutable objects holding only the fields the integration
+uses; the raw nested dicts are not kept.
+"""
+import dataclasses
+import logging
+import zlib
+from dataclasses import dataclass
+from types import MappingProxyType
+
+_LOGGER = logging.getLogger(__name__)
+
+# audio output labels already warned about (device info is re-parsed every few minutes)
+_COLLISIONS_WARNED = set()
+
+
+@dataclass(slots=True, frozen=True)
+class OutputState:
+    """Routing/audio state of one output as reported by /api/data/200/."""
+
+    output_id: str
+    input_id: str | None = None
+    volume: int = 0
+    mute: bool = False
+
+    @property
+    def active(self):
+        # soft-power: ON if input_id > 0, else OFF
+        try:
+            return int(self.input_id or 0) > 0
+        except ValueError:
+            return True
+
+    def replace(self, **changes):
+        return dataclasses.replace(self, **changes)
+
+
+@dataclass(slots=True, frozen=True)
+class Zone:
+    zone_id: str | None
+    outputs: tuple[OutputState, ...]
+
+
+@dataclass(slots=True, frozen=True)
+class InputLabel:
+    id: str
+    label: str
+
+
+@dataclass(slots=True, frozen=True)
+class OutputLabel:
+    id: str
+    label: str
+
+
+@dataclass(slots=True, frozen=True)
+class DeviceInfo:
+    """Static device document (/api/data/100/): identity, labels and port counts."""
+
+    model: str | None = None
+    api_version: str | None = None
+    firmware: str | None = None
+    inputs: tuple[InputLabel, ...] = ()
+    outputs: tuple[OutputLabel, ...] = ()
+    input_ports: int = 0
+    output_ports: int = 0
+    supports_audio: bool = False
+    # separately routable audio matrix (MHUB AUDIO and audio-capable models); mirrors are not listed
+    audio_inputs: tuple[InputLabel, ...] = ()
+    audio_outputs: tuple[OutputLabel, ...] = ()
+
+    @classmethod
+    def from_data(cls, data):
+        mhub = data.get("mhub", {}) or {}
+        io = data.get("io_data", {}) or {}
+        iv = io.get("input_video") or []
+        ov = io.get("output_video") or []
+        outputs = _output_labels(ov)
+        return cls(
+            model=mhub.get("mhub_official_name") or mhub.get("mhub_name"),
+            api_version=mhub.get("api"),
+            firmware=mhub.get("mhub-os_version") or mhub.get("mhub_firmware"),
+            inputs=_input_labels(iv),
+            outputs=outputs,
+            input_ports=_ports(iv),
+            output_ports=_ports(ov),
+            supports_audio=bool(
+                io.get("output_audio") or io.get("output_audio_mirror")
+                or io.get("input_audio") or io.get("input_audio_mirror")
+            ),
+            audio_inputs=_input_labels(io.get("input_audio") or []),
+            audio_outputs=_audio_output_labels(io.get("output_audio") or [], outputs),
+        )
+
+    def as_dict(self):
+        """Plain-JSON form for the persisted startup cache."""
+        return dataclasses.asdict(self)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            **{
+                **data,
+                "inputs": tuple(InputLabel(**lbl) for lbl in data.get("inputs", ())),
+                "outputs": tuple(OutputLabel(**lbl) for lbl in data.get("outputs", ())),
+                "audio_inputs": tuple(InputLabel(**lbl) for lbl in data.get("audio_inputs", ())),
+                "audio_outputs": tuple(OutputLabel(**lbl) for lbl in data.get("audio_outputs", ())),
+            }
+        )
+
+
+def _input_labels(groups):
+    # inputs are labelled once, on the first group
+    if not groups or not isinstance(groups, list):
+        return ()
+    return tuple(InputLabel(str(lbl.get("id")), lbl.get("label")) for lbl in groups[0].get("labels", []))
+
+
+def _output_labels(groups):
+    return tuple(
+        OutputLabel(str(lbl.get("id")), lbl.get("label"))
+        for o in groups
+        for lbl in o.get("labels", [])
+    )
+
+
+def _audio_output_labels(groups, video_outputs):
+    # audio and video outputs share the zone state and the control endpoints, keyed by output id,
+    # so an audio output reusing a video output's id cannot be told apart from it
+    video_ids = {lbl.id.lower() for lbl in video_outputs}
+    labels = []
+    for lbl in _output_labels(groups):
+        if lbl.id.lower() in video_ids:
+            if lbl not in _COLLISIONS_WARNED:
+                _COLLISIONS_WARNED.add(lbl)
+                _LOGGER.warning("Skipping MHUB audio output %s: its id is also a video output", lbl.id)
+            continue
+        labels.append(lbl)
+    return tuple(labels)
+
+
+def _ports(groups):
+    try:
+        return int(groups[0].get("ports")) if groups else 0
+    except (TypeError, ValueError):
+        return len(groups)
+
+
+def parse_zones(data):
+    """Zones of a /api/data/200/ document; the first report of an output wins."""
+    zones = []
+    seen = set()
+    for zone in data.get("zones", []) or []:
+        outputs = []
+        for s in zone.get("state", []) or []:
+            output_id = str(s.get("output_id")).lower()
+            if output_id in seen:
+                continue
+            seen.add(output_id)
+            try:
+                volume = int(s.get("volume", 0))
+            except (TypeError, ValueError):
+                volume = 0
+            input_id = s.get("input_id")
+            outputs.append(
+                OutputState(
+                    output_id,
+                    None if input_id is None else str(input_id),
+                    volume,
+                    bool(s.get("mute", False)),
+                )
+            )
+        zones.append(Zone(zone.get("zone_id"), tuple(outputs)))
+    return tuple(zones)
+
+
+@dataclass(slots=True, frozen=True)
+class MHUBSnapshot:
+    """coordinator.data: the device document plus the latest zone state."""
+
+    device: DeviceInfo
+    zones: tuple[Zone, ...] = ()
+
+
+class SourceMap:
+    """Input id <-> label maps and the ordered source list of one input matrix.
+
+    The maps are computed on first use and the instance is carried over
+    from index to index until the device's input labels change, so every
+    entity shares one copy per label set.
+    """
+
+    __slots__ = ("inputs", "_labels", "_ids", "_source_list")
+
+    def __init__(self, inputs=()):
+        self.inputs = tuple(inputs)
+        self._labels = None
+        self._ids = None
+        self._source_list = None
+
+    def _build(self):
+        labels = {}
+        ids = {}
+        for lbl in self.inputs:
+            labels[lbl.id] = lbl.label
+            ids.setdefault(lbl.label, lbl.id)
+        self._labels = MappingProxyType(labels)
+        self._ids = MappingProxyType(ids)
+        self._source_list = tuple(lbl.label for lbl in self.inputs)
+
+    @property
+    def labels(self):
+        if self._labels is None:
+            self._build()
+        return self._labels
+
+    @property
+    def ids(self):
+        if self._ids is None:
+            self._build()
+        return self._ids
+
+    @property
+    def source_list(self):
+        if self._source_list is None:
+            self._build()
+        return self._source_list
+
+    def reuse(self, inputs):
+        """This map if it was built from ``inputs``, else a fresh one."""
+        if inputs is self.inputs or inputs == self.inputs:
+            return self
+        return SourceMap(inputs)
+
+
+class RoutingIndex:
+    """Per-refresh snapshot index: output -> state plus input id <-> label maps.
+
+    Built once by the coordinator after each refresh so entities never walk
+    the zone or label lists on a property read. Video and audio outputs share
+    the output map (the hub reports both in the same zones, audio outputs
+    whose id collides with a video output are not indexed as audio); their
+    inputs are labelled separately.
+    """
+
+    __slots__ = ("outputs", "video", "audio", "_routing_hash")
+
+    def __init__(self, outputs=None, video=None, audio=None):
+        self.outputs = MappingProxyType(outputs or {})
+        self.video = video or SourceMap()
+        self.audio = audio or SourceMap()
+        self._routing_hash = None
+
+    @classmethod
+    def build(cls, device, zones, previous=None):
+        """Index ``zones``; label maps are taken over from ``previous`` while unchanged."""
+        outputs = {state.output_id: state for zone in zones for state in zone.outputs}
+        if previous is None:
+            return cls(outputs, SourceMap(device.inputs), SourceMap(device.audio_inputs))
+        return cls(
+            outputs, previous.video.reuse(device.inputs), previous.audio.reuse(device.audio_inputs)
+        )
+
+    def with_output(self, state):
+        """Copy of this index with one output replaced (labels are shared)."""
+        outputs = dict(self.outputs)
+        outputs[state.output_id] = state
+        return RoutingIndex(outputs, self.video, self.audio)
+
+    @property
+    def routing_hash(self):
+        """Stable CRC of the whole output -> input/volume/mute matrix, computed on first use."""
+        if self._routing_hash is None:
+            matrix = sorted((o, s.input_id, s.volume, s.mute) for o, s in self.outputs.items())
+            self._routing_hash = zlib.crc32(repr(matrix).encode())
+        return self._routing_hash
+
+    def output(self, output_id):
+        return self.outputs.get(output_id)
+
+    def sources(self, audio=False):
+        return self.audio if audio else self.video
+
+    def input_label(self, input_id, audio=False):
+        return self.sources(audio).labels.get(str(input_id), f"Input {input_id}")
+
+    def input_id(self, label, audio=False):
+        """Input id of a source label, or None if no input has that label."""
+        return self.sources(audio).ids.get(label)
+
+
+def changed_outputs(old, new):
+    """Outputs whose state differs between two indexes; None when labels changed (rewrite all)."""
+    if old.video is not new.video or old.audio is not new.audio:
+        return None
+    return frozenset(
+        output_id
+        for output_id in old.outputs.keys() | new.outputs.keys()
+        if old.outputs.get(output_id) != new.outputs.get(output_id)
+    )
@@ -0,0 +1,26 @@
+"""Poll slots that keep many hubs from polling in lockstep.
+
+Each hub owns a stable phase (0..1 of an interval) and polls at ``phase *
+interval`` into every interval of the monotonic clock, whatever interval it
+is currently using, so hubs stay spread across the interval while they
+switch between fast and idle polling.
+"""
+import zlib
+
+
+def hub_phase(key):
+    """Stable phase of one hub, from its config entry id."""
+    return zlib.crc32(key.encode()) / 2**32
+
+
+def next_slot(now, interval, phase):
+    """Clock time of the hub's next poll slot after ``now``.
+
+    A slot closer than min(1s, half an interval) is skipped, so a poll that
+    ran long is not followed straight away by another.
+    """
+    offset = phase * interval
+    slot = now - (now - offset) % interval + interval
+    if slot - now < min(1, interval / 2):
+        slot += interval
+    return slot
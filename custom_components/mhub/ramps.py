@@ -0,0 +1,147 @@
+"""Timed volume ramps (fades) paced by a per-hub request-rate budget."""
+import asyncio
+import logging
+import time
+
+from homeassistant.core import callback
+
+from .const import RAMP_MAX_RATE
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class RateBudget:
+    """Spaces requests at least 1/rate apart, shared by every ramp of one hub."""
+
+    def __init__(self, rate):
+        self._spacing = 1 / rate
+        self._next = 0.0
+
+    async def async_take(self, count=1):
+        now = time.monotonic()
+        start = max(now, self._next)
+        self._next = start + count * self._spacing
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
+class _Ramp:
+    __slots__ = ("targets", "starts", "sent", "futures")
+
+    def __init__(self, targets, starts):
+        self.targets = targets
+        self.starts = starts
+        self.sent = {}
+        self.futures = {}
+
+
+class VolumeRamper:
+    """Runs volume fades for one hub.
+
+    A ramp owns its outputs until it finishes; a newer ramp (or a direct
+    volume command) for an output takes it over, and the older ramp drops
+    that output at its next step and ends once it owns none. Steps are sized
+    to the hub's request budget and paced by a budget shared by all running
+    ramps. Every step goes through the command scheduler, so a step still
+    queued when the next one is due is superseded rather than piled up. The
+    hub is polled once when a ramp completes.
+    """
+
+    def __init__(self, coordinator, rate=RAMP_MAX_RATE):
+        self._coordinator = coordinator
+        self._rate = rate
+        self._budget = RateBudget(rate)
+        self._owners = {}
+        self._tasks = set()
+        self.completed = 0
+        self.superseded = 0
+
+    @property
+    def active(self):
+        return len(self._tasks)
+
+    def as_dict(self):
+        return {
+            "active": self.active,
+            "fading_outputs": len(self._owners),
+            "completed": self.completed,
+            "superseded": self.superseded,
+        }
+
+    @callback
+    def async_release(self, output_id):
+        """Stop fading an output (a direct volume command overrides the ramp)."""
+        self._owners.pop(output_id, None)
+
+    async def async_ramp(self, targets, duration):
+        """Fade {output_id: volume} over ``duration`` seconds.
+
+        Returns {output_id: True | False | None}: sent, failed, or taken over
+        by a newer ramp or command before the fade finished.
+        """
+        if not targets:
+            return {}
+        index = self._coordinator.index
+        starts = {}
+        for output_id in targets:
+            state = index.output(output_id)
+            starts[output_id] = state.volume if state is not None else targets[output_id]
+        ramp = _Ramp(targets, starts)
+        for output_id in targets:
+            if self._owners.get(output_id) is not None:
+                self.superseded += 1
+            self._owners[output_id] = ramp
+        task = self._coordinator.hass.async_create_task(self._async_run(ramp, duration))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return await task
+
+    def _owned(self, ramp):
+        return [o for o in ramp.targets if self._owners.get(o) is ramp]
+
+    async def _async_run(self, ramp, duration):
+        coordinator = self._coordinator
+        span = max(abs(ramp.targets[o] - ramp.starts[o]) for o in ramp.targets)
+        # one volume request per output per step, within the budget and never finer than 1 step
+        steps = max(1, min(span, int(duration * self._rate / len(ramp.targets))))
+        interval = duration / steps
+        _LOGGER.debug("MHUB volume ramp %s over %.1fs in %s steps", ramp.targets, duration, steps)
+        started = time.monotonic()
+        with coordinator.bulk_operation():
+            try:
+                for step in range(1, steps + 1):
+                    owned = self._owned(ramp)
+                    if not owned:
+                        break
+                    await self._budget.async_take(len(owned))
+                    for output_id in owned:
+                        start, target = ramp.starts[output_id], ramp.targets[output_id]
+                        volume = round(start + (target - start) * step / steps)
+                        if ramp.sent.get(output_id) == volume:
+                            continue
+                        ramp.sent[output_id] = volume
+                        ramp.futures[output_id] = coordinator.async_set_volume(output_id, volume, ramp=True)
+                    delay = started + step * interval - time.monotonic()
+                    if delay > 0 and step < steps:
+                        await asyncio.sleep(delay)
+                results = {}
+                for output_id in ramp.targets:
+                    if self._owners.get(output_id) is not ramp:
+                        results[output_id] = None
+                        continue
+                    future = ramp.futures.get(output_id)
+                    results[output_id] = True if future is None else await future
+            finally:
+                for output_id in ramp.targets:
+                    if self._owners.get(output_id) is ramp:
+                        del self._owners[output_id]
+        if any(ok is not None for ok in results.values()):
+            self.completed += 1
+            await coordinator.async_refresh_after_bulk()
+        return results
+
+    async def async_shutdown(self):
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._owners.clear()
@@ -0,0 +1,88 @@
+"""Whole-matrix routing sensor plus optional diagnostic sensors exposing MHUB hot-path metrics."""
+from homeassistant.components.sensor import SensorEntity, SensorStateClass
+from homeassistant.const import UnitOfTime
+from homeassistant.helpers.entity import EntityCategory
+from .const import DOMAIN
+from .entity import MHUBEntity
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 1)
+
+
+# key, name, unit, state class, value
+SENSORS = (
+    ("poll_latency", "Poll Latency", UnitOfTime.MILLISECONDS, SensorStateClass.MEASUREMENT,
+     lambda c: _ms(c.poll_latency.last)),
+    ("requests", "Requests", None, SensorStateClass.TOTAL_INCREASING,
+     lambda c: c.api.stats.requests),
+    ("request_failures", "Request Failures", None, SensorStateClass.TOTAL_INCREASING,
+     lambda c: c.api.stats.failures + c.poll_timeouts),
+    ("command_rtt", "Command Round Trip", UnitOfTime.MILLISECONDS, SensorStateClass.MEASUREMENT,
+     lambda c: _ms(c.api.stats.command_rtt())),
+    ("command_queue", "Command Queue Depth", None, SensorStateClass.MEASUREMENT,
+     lambda c: c.commands.queue_depth),
+)
+
+
+async def async_setup_entry(hass, entry, async_add_entities):
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    entities = [MHUBMatrixSensor(coordinator)]
+    entities.extend(MHUBDiagnosticSensor(coordinator, *sensor) for sensor in SENSORS)
+    async_add_entities(entities)
+
+
+class MHUBMatrixSensor(MHUBEntity, SensorEntity):
+    """The whole routing matrix in one entity.
+
+    The state is the routing hash; the ``outputs`` attribute maps every
+    output to ``[input_id, volume, mute]``. It is only written when the hash
+    changes (or availability does), not on every refresh.
+    """
+
+    _attr_icon = "mdi:video-switch"
+
+    def __init__(self, coordinator):
+        super().__init__(coordinator)
+        self._attr_name = "MHUB Matrix"
+        self._attr_unique_id = self._unique_id("matrix")
+        self._routing_hash = None
+        self._update_from_index()
+
+    def _should_write(self):
+        changed = self.coordinator.changed_outputs
+        if changed is None:
+            return True
+        return bool(changed) and self.coordinator.index.routing_hash != self._routing_hash
+
+    def _update_from_index(self):
+        index = self.coordinator.index
+        self._routing_hash = index.routing_hash
+        self._attr_native_value = f"{self._routing_hash:08x}"
+        self._attr_extra_state_attributes = {
+            "outputs": {o: [s.input_id, s.volume, s.mute] for o, s in sorted(index.outputs.items())}
+        }
+
+
+class MHUBDiagnosticSensor(MHUBEntity, SensorEntity):
+    """One performance counter of the hub; stays available while the hub is down."""
+
+    _notify_always = True
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(self, coordinator, key, name, unit, state_class, value):
+        super().__init__(coordinator)
+        self._value = value
+        self._attr_name = f"MHUB {name}"
+        self._attr_unique_id = self._unique_id(f"diag_{key}")
+        self._attr_native_unit_of_measurement = unit
+        self._attr_state_class = state_class
+
+    @property
+    def available(self):
+        return True
+
+    @property
+    def native_value(self):
+        return self._value(self.coordinator)
@@ -0,0 +1,215 @@
+"""Hub-level services: device info refresh, bulk routing, volume ramps and scenes."""
+import logging
+
+import voluptuous as vol
+
+from homeassistant.core import HomeAssistant, ServiceCall, SupportsResponse, callback
+from homeassistant.exceptions import HomeAssistantError
+import homeassistant.helpers.config_validation as cv
+
+from .const import DEFAULT_RAMP_DURATION, DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_REFRESH_DEVICE_INFO = "refresh_device_info"
+SERVICE_APPLY_ROUTING = "apply_routing"
+SERVICE_SET_VOLUMES = "set_volumes"
+SERVICE_SAVE_SCENE = "save_scene"
+SERVICE_RECALL_SCENE = "recall_scene"
+SERVICE_RAMP_VOLUME = "ramp_volume"
+SERVICES = (
+    SERVICE_REFRESH_DEVICE_INFO,
+    SERVICE_APPLY_ROUTING,
+    SERVICE_SET_VOLUMES,
+    SERVICE_SAVE_SCENE,
+    SERVICE_RECALL_SCENE,
+    SERVICE_RAMP_VOLUME,
+)
+
+ATTR_ENTRY_ID = "entry_id"
+ATTR_OUTPUTS = "outputs"
+ATTR_VOLUMES = "volumes"
+ATTR_NAME = "name"
+ATTR_VOLUME = "volume"
+ATTR_DURATION = "duration"
+
+INPUT = vol.Any(vol.Coerce(int), cv.string)
+VOLUME = vol.All(vol.Coerce(int), vol.Range(min=0, max=100))
+OUTPUT_SPEC = vol.Any(
+    {
+        vol.Optional("input"): INPUT,
+        vol.Optional("volume"): VOLUME,
+        vol.Optional("mute"): cv.boolean,
+    },
+    INPUT,
+)
+
+REFRESH_SCHEMA = vol.Schema({vol.Optional(ATTR_ENTRY_ID): cv.string})
+APPLY_ROUTING_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_ENTRY_ID): cv.string,
+        vol.Required(ATTR_OUTPUTS): {cv.string: OUTPUT_SPEC},
+    }
+)
+SET_VOLUMES_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_ENTRY_ID): cv.string,
+        vol.Required(ATTR_VOLUMES): {cv.string: VOLUME},
+    }
+)
+SAVE_SCENE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_ENTRY_ID): cv.string,
+        vol.Required(ATTR_NAME): cv.string,
+        vol.Optional(ATTR_OUTPUTS): {cv.string: OUTPUT_SPEC},
+    }
+)
+RAMP_VOLUME_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Optional(ATTR_ENTRY_ID): cv.string,
+            vol.Optional(ATTR_OUTPUTS): vol.All(cv.ensure_list, [cv.string], vol.Length(min=1)),
+            vol.Optional(ATTR_VOLUME): VOLUME,
+            vol.Optional(ATTR_VOLUMES): vol.All({cv.string: VOLUME}, vol.Length(min=1)),
+            vol.Optional(ATTR_DURATION, default=DEFAULT_RAMP_DURATION): vol.All(
+                vol.Coerce(float), vol.Range(min=0, max=600)
+            ),
+        }
+    ),
+    cv.has_at_least_one_key(ATTR_OUTPUTS, ATTR_VOLUMES),
+)
+RECALL_SCENE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_ENTRY_ID): cv.string,
+        vol.Required(ATTR_NAME): cv.string,
+    }
+)
+
+
+def _coordinators(hass, call):
+    coordinators = hass.data.get(DOMAIN, {})
+    entry_id = call.data.get(ATTR_ENTRY_ID)
+    if entry_id is not None:
+        if entry_id not in coordinators:
+            raise HomeAssistantError(f"No loaded MHUB with entry_id {entry_id}")
+        return [coordinators[entry_id]]
+    return list(coordinators.values())
+
+
+def _coordinator(hass, call):
+    coordinators = _coordinators(hass, call)
+    if len(coordinators) != 1:
+        raise HomeAssistantError("entry_id is required when more than one MHUB is configured")
+    return coordinators[0]
+
+
+def _output_id(coordinator, output_id):
+    """Lower-cased id of one of the hub's video or audio outputs; anything else is rejected."""
+    output_id = str(output_id).lower()
+    device = coordinator.data.device
+    if not any(lbl.id.lower() == output_id for lbl in device.outputs + device.audio_outputs):
+        raise HomeAssistantError(f"Unknown MHUB output: {output_id}")
+    return output_id
+
+
+def _normalize(coordinator, outputs):
+    """{output: input | {input, volume, mute}} -> {output_id: {...}} with inputs resolved to ids."""
+    normalized = {}
+    for output_id, spec in outputs.items():
+        if not isinstance(spec, dict):
+            spec = {"input": spec}
+        spec = dict(spec)
+        output_id = _output_id(coordinator, output_id)
+        if spec.get("input") is not None:
+            value = str(spec["input"])
+            # accept source labels as well as input ids, nothing else
+            sources = coordinator.index.sources(coordinator.is_audio_output(output_id))
+            if value in sources.ids:
+                spec["input"] = sources.ids[value]
+            elif value in sources.labels:
+                spec["input"] = value
+            else:
+                raise HomeAssistantError(f"Unknown MHUB source for output {output_id}: {value}")
+        normalized[output_id] = spec
+    return normalized
+
+
+@callback
+def async_setup_services(hass: HomeAssistant):
+    if hass.services.has_service(DOMAIN, SERVICE_REFRESH_DEVICE_INFO):
+        return
+
+    async def _refresh_device_info(call: ServiceCall):
+        # labels edited on the hub: refetch /api/data/100/ without waiting for the slow tier
+        for coordinator in _coordinators(hass, call):
+            await coordinator.async_request_info_refresh()
+
+    async def _apply_routing(call: ServiceCall):
+        coordinator = _coordinator(hass, call)
+        results = await coordinator.async_apply_bulk(_normalize(coordinator, call.data[ATTR_OUTPUTS]))
+        return {"results": results}
+
+    async def _set_volumes(call: ServiceCall):
+        coordinator = _coordinator(hass, call)
+        outputs = {
+            _output_id(coordinator, output_id): {"volume": volume}
+            for output_id, volume in call.data[ATTR_VOLUMES].items()
+        }
+        return {"results": await coordinator.async_apply_bulk(outputs)}
+
+    async def _save_scene(call: ServiceCall):
+        coordinator = _coordinator(hass, call)
+        if ATTR_OUTPUTS in call.data:
+            outputs = _normalize(coordinator, call.data[ATTR_OUTPUTS])
+        else:
+            outputs = coordinator.routing_snapshot()
+        coordinator.async_save_scene(call.data[ATTR_NAME], outputs)
+        return {"outputs": outputs}
+
+    async def _recall_scene(call: ServiceCall):
+        coordinator = _coordinator(hass, call)
+        scene = coordinator.scenes.get(call.data[ATTR_NAME])
+        if scene is None:
+            raise HomeAssistantError(f"Unknown MHUB scene: {call.data[ATTR_NAME]}")
+        return {"results": await coordinator.async_apply_bulk(scene)}
+
+    async def _ramp_volume(call: ServiceCall):
+        coordinator = _coordinator(hass, call)
+        targets = {_output_id(coordinator, o): v for o, v in call.data.get(ATTR_VOLUMES, {}).items()}
+        if ATTR_OUTPUTS in call.data:
+            if ATTR_VOLUME not in call.data:
+                raise HomeAssistantError("volume is required when ramping a list of outputs")
+            targets.update(
+                (_output_id(coordinator, o), call.data[ATTR_VOLUME]) for o in call.data[ATTR_OUTPUTS]
+            )
+        return {"results": await coordinator.ramps.async_ramp(targets, call.data[ATTR_DURATION])}
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_REFRESH_DEVICE_INFO, _refresh_device_info, schema=REFRESH_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_APPLY_ROUTING, _apply_routing,
+        schema=APPLY_ROUTING_SCHEMA, supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_SET_VOLUMES, _set_volumes,
+        schema=SET_VOLUMES_SCHEMA, supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_SAVE_SCENE, _save_scene,
+        schema=SAVE_SCENE_SCHEMA, supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_RECALL_SCENE, _recall_scene,
+        schema=RECALL_SCENE_SCHEMA, supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_RAMP_VOLUME, _ramp_volume,
+        schema=RAMP_VOLUME_SCHEMA, supports_response=SupportsResponse.OPTIONAL,
+    )
+
+
+@callback
+def async_unload_services(hass: HomeAssistant):
+    for service in SERVICES:
+        hass.services.async_remove(DOMAIN, service)
@@ -0,0 +1,109 @@
+"""Lightweight hot-path counters for the MHUB client and command queue."""
+from collections import defaultdict
+
+# upper bounds of the latency histogram buckets, in milliseconds
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram with count/mean/last/max."""
+
+    __slots__ = ("buckets", "count", "total", "last", "max")
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.last = None
+        self.max = 0.0
+
+    def record(self, seconds):
+        ms = seconds * 1000
+        for n, bound in enumerate(LATENCY_BUCKETS_MS):
+            if ms <= bound:
+                self.buckets[n] += 1
+                break
+        else:
+            self.buckets[-1] += 1
+        self.count += 1
+        self.total += seconds
+        self.last = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def as_dict(self):
+        labels = [f"<={bound}ms" for bound in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+        return {
+            "count": self.count,
+            "mean_ms": _ms(self.mean),
+            "last_ms": _ms(self.last),
+            "max_ms": _ms(self.max) if self.count else None,
+            "buckets": dict(zip(labels, self.buckets)),
+        }
+
+
+class EndpointStats:
+    """Counters for one endpoint ("data/200", "control/switch", ...)."""
+
+    __slots__ = ("requests", "failures", "timeouts", "retries", "rejected", "bytes", "latency", "decode")
+
+    def __init__(self):
+        self.requests = 0
+        self.failures = 0
+        self.timeouts = 0
+        # retried attempts, and requests refused while the circuit breaker was open
+        self.retries = 0
+        self.rejected = 0
+        self.bytes = 0
+        self.latency = LatencyHistogram()
+        self.decode = LatencyHistogram()
+
+    def as_dict(self):
+        return {
+            "requests": self.requests,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "retries": self.retries,
+            "rejected": self.rejected,
+            "bytes": self.bytes,
+            "latency": self.latency.as_dict(),
+            "decode": self.decode.as_dict(),
+        }
+
+
+class RequestStats:
+    """Per-endpoint request statistics of one API client."""
+
+    def __init__(self):
+        self.endpoints = defaultdict(EndpointStats)
+
+    def endpoint(self, name):
+        return self.endpoints[name]
+
+    @property
+    def requests(self):
+        return sum(e.requests for e in self.endpoints.values())
+
+    @property
+    def failures(self):
+        return sum(e.failures + e.timeouts for e in self.endpoints.values())
+
+    def command_rtt(self):
+        """Mean round-trip time of all control commands (seconds, or None)."""
+        count = total = 0
+        for name, e in self.endpoints.items():
+            if name.startswith("control/") or name == "power":
+                count += e.latency.count
+                total += e.latency.total
+        return total / count if count else None
+
+    def as_dict(self):
+        return {name: e.as_dict() for name, e in sorted(self.endpoints.items())}
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 2)
@@ -4,19 +4,22 @@ switch.py for MHUB integration
 - Adds two global stateless power switches:
     - switch.mhub_power_on  -> calls /api/power/1/
     - switch.mhub_power_off -> calls /api/power/0/
+- Adds the full-system power switch on hubs that support /api/control/power/
 """
 
 from homeassistant.components.switch import SwitchEntity
-import aiohttp
 import logging
 from .const import DOMAIN
+from .entity import MHUBEntity
+from .system_power import MHUBSystemPower
 
 _LOGGER = logging.getLogger(__name__)
 
 
 async def async_setup_entry(hass, entry, async_add_entities):
     coordinator = hass.data[DOMAIN][entry.entry_id]
-    outputs = coordinator.output_labels()
+    # video outputs and audio zones
+    outputs = {**coordinator.output_labels(), **coordinator.audio_output_labels()}
 
     entities = []
     # Existing per-output mute switches
@@ -27,65 +30,42 @@ async def async_setup_entry(hass, entry, async_add_entities):
     entities.append(MHUBPowerTrigger(coordinator, True))   # Power ON
     entities.append(MHUBPowerTrigger(coordinator, False))  # Power OFF
 
-    async_add_entities(entities, True)
+    # Full-system power, when the capability probe found the control power endpoint
+    if coordinator.model_info.get("supports_power"):
+        entities.append(MHUBSystemPower(coordinator))
 
+    async_add_entities(entities)
 
-class MHUBZoneMute(SwitchEntity):
+
+class MHUBZoneMute(MHUBEntity, SwitchEntity):
     """Per-output mute switch (existing behavior)."""
 
     def __init__(self, coordinator, output_id, name):
-        self._coordinator = coordinator
-        self._output_id = str(output_id).lower()
+        super().__init__(coordinator, output_id)
         self._attr_name = f"{name} Mute"
-        self._attr_unique_id = f"mhub_mute_{output_id}"
+        self._attr_unique_id = self._unique_id(f"mute_{output_id}")
 
     @property
     def is_on(self):
-        zones = self._coordinator.data.get("state", {}).get("zones", [])
-        for zone in zones:
-            for s in zone.get("state", []):
-                if str(s.get("output_id")).lower() == self._output_id:
-                    return bool(s.get("mute", False))
-        return False
+        state = self.coordinator.index.output(self._output_id)
+        return state.mute if state is not None else False
 
     async def async_turn_on(self, **kwargs):
         """Mute this output."""
-        output_id = self._output_id.lower()
-        url = f"http://{self._coordinator.host}/api/control/mute/{output_id}/true/"
-        _LOGGER.debug(f"Muting MHUB output: {url}")
-        headers = {"User-Agent": "curl/8.0", "Accept": "application/json"}
-        try:
-            async with aiohttp.ClientSession(headers=headers) as session:
-                async with session.get(url, allow_redirects=True) as resp:
-                    text = await resp.text()
-                    if resp.status == 200:
-                        _LOGGER.info(f"MHUB mute on: Output {output_id.upper()}")
-                    else:
-                        _LOGGER.warning(f"MHUB mute failed: HTTP {resp.status} | {text}")
-        except Exception as e:
-            _LOGGER.error(f"MHUB mute request failed: {e}")
-        await self._coordinator.async_request_refresh()
+        await self._async_set_mute(True)
 
     async def async_turn_off(self, **kwargs):
         """Unmute this output."""
+        await self._async_set_mute(False)
+
+    async def _async_set_mute(self, mute):
         output_id = self._output_id.lower()
-        url = f"http://{self._coordinator.host}/api/control/mute/{output_id}/false/"
-        _LOGGER.debug(f"Unmuting MHUB output: {url}")
-        headers = {"User-Agent": "curl/8.0", "Accept": "application/json"}
-        try:
-            async with aiohttp.ClientSession(headers=headers) as session:
-                async with session.get(url, allow_redirects=True) as resp:
-                    text = await resp.text()
-                    if resp.status == 200:
-                        _LOGGER.info(f"MHUB mute off: Output {output_id.upper()}")
-                    else:
-                        _LOGGER.warning(f"MHUB unmute failed: HTTP {resp.status} | {text}")
-        except Exception as e:
-            _LOGGER.error(f"MHUB unmute request failed: {e}")
-        await self._coordinator.async_request_refresh()
-
-
-class MHUBPowerTrigger(SwitchEntity):
+        _LOGGER.debug(f"{'Muting' if mute else 'Unmuting'} MHUB output: {output_id.upper()}")
+        if await self.coordinator.async_set_mute(output_id, mute):
+            _LOGGER.info(f"MHUB mute {'on' if mute else 'off'}: Output {output_id.upper()}")
+
+
+class MHUBPowerTrigger(MHUBEntity, SwitchEntity):
     """
     Stateless global power trigger switch.
     - If is_on_switch == True  -> acts as 'Power ON' button (calls /api/power/1/)
@@ -94,10 +74,10 @@ class MHUBPowerTrigger(SwitchEntity):
     """
 
     def __init__(self, coordinator, is_on_switch: bool):
-        self._coordinator = coordinator
+        super().__init__(coordinator)
         self._is_on_switch = is_on_switch
         self._attr_name = f"MHUB Power {'On' if is_on_switch else 'Off'}"
-        self._attr_unique_id = f"mhub_power_{'on' if is_on_switch else 'off'}"
+        self._attr_unique_id = self._unique_id(f"power_{'on' if is_on_switch else 'off'}")
         self._attr_icon = "mdi:power"
 
     @property
@@ -111,23 +91,11 @@ class MHUBPowerTrigger(SwitchEntity):
     async def async_turn_on(self, **kwargs):
         """Send the appropriate power command to the MHUB."""
         value = 1 if self._is_on_switch else 0
-        url = f"http://{self._coordinator.host}/api/power/{value}/"
-        headers = {"User-Agent": "curl/8.0", "Accept": "application/json"}
-        _LOGGER.info(f"🔌 Sending MHUB Power {'ON' if value else 'OFF'} -> {url}")
-
-        try:
-            async with aiohttp.ClientSession(headers=headers) as session:
-                async with session.get(url, allow_redirects=True) as resp:
-                    text = await resp.text()
-                    if resp.status == 200:
-                        _LOGGER.info(f"✅ MHUB Power {'ON' if value else 'OFF'} success")
-                    else:
-                        _LOGGER.warning(f"⚠️ MHUB Power command failed HTTP {resp.status}: {text}")
-        except Exception as e:
-            _LOGGER.error(f"❌ MHUB Power command error: {e}")
-
-        # trigger a coordinator refresh so the integration updates immediately
-        await self._coordinator.async_request_refresh()
+        _LOGGER.info(f"🔌 Sending MHUB Power {'ON' if value else 'OFF'}")
+
+        if await self.coordinator.async_power(value):
+            _LOGGER.info(f"✅ MHUB Power {'ON' if value else 'OFF'} success")
+
         # write state (stateless - keep UI consistent)
         self.async_write_ha_state()
 
@@ -1,52 +1,54 @@
 from homeassistant.components.switch import SwitchEntity
-import aiohttp
 import logging
-from .const import DOMAIN
+from .api import MHUBApiError
+from .entity import MHUBEntity
 
 _LOGGER = logging.getLogger(__name__)
 
-async def async_setup_entry(hass, entry, async_add_entities):
-    coordinator = hass.data[DOMAIN][entry.entry_id]
-    async_add_entities([MHUBSystemPower(coordinator)], True)
 
-
-class MHUBSystemPower(SwitchEntity):
-    """Global on/off for the entire MHUB chassis."""
+class MHUBSystemPower(MHUBEntity, SwitchEntity):
+    """Global on/off for the entire MHUB chassis (created by the switch platform)."""
 
     _attr_name = "MHUB System Power"
     _attr_icon = "mdi:power"
-    _attr_unique_id = "mhub_system_power"
 
     def __init__(self, coordinator):
-        self._coordinator = coordinator
+        super().__init__(coordinator)
+        self._attr_unique_id = self._unique_id("system_power")
         self._state = True  # assume ON by default
 
     @property
     def is_on(self):
         return self._state
 
-    async def async_turn_on(self):
+    async def async_turn_on(self, **kwargs):
         await self._send_power_command(1)
 
-    async def async_turn_off(self):
+    async def async_turn_off(self, **kwargs):
         await self._send_power_command(0)
 
     async def _send_power_command(self, value):
         """Send full-system power command, fallback to soft logic."""
-        url = f"http://{self._coordinator.host}/api/control/power/{value}/"
-        headers = {"User-Agent": "curl/8.0", "Accept": "application/json"}
         _LOGGER.info(f"🔌 Sending MHUB system power {value}")
-        try:
-            async with aiohttp.ClientSession(headers=headers) as s:
-                async with s.get(url, allow_redirects=True) as resp:
-                    if resp.status == 200:
-                        _LOGGER.info(f"✅ MHUB system power {'ON' if value else 'OFF'}")
-                        self._state = bool(value)
-                    else:
-                        _LOGGER.warning(f"⚠️ System power failed HTTP {resp.status}")
-        except Exception as e:
-            _LOGGER.error(f"❌ MHUB system power request failed: {e}")
-            # fallback: soft toggle
+        rejected = None
+
+        async def send(value):
+            nonlocal rejected
+            try:
+                await self.coordinator.api.async_system_power(value)
+            except MHUBApiError as e:
+                # the hub answered with an error status: keep the current state
+                if e.status is not None:
+                    rejected = e.status
+                raise
+
+        ok = await self.coordinator.async_system_power(value, send)
+        if ok:
+            _LOGGER.info(f"✅ MHUB system power {'ON' if value else 'OFF'}")
+            self._state = bool(value)
+        elif ok is False and rejected is not None:
+            _LOGGER.warning(f"⚠️ System power failed HTTP {rejected}")
+        elif ok is False:
+            # transport error: fallback soft toggle
             self._state = bool(value)
         self.async_write_ha_state()
-        await self._coordinator.async_request_refresh()